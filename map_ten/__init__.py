@@ -1,4 +1,3 @@
-from .map_editor import MapEditor
 from .map_io import load_map, save_map, save_paths, export_occupancy_grid
 
 __all__ = [
@@ -7,4 +6,14 @@ __all__ = [
     "save_map",
     "save_paths",
     "export_occupancy_grid",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    # The Tk editor is imported on first use so CLI commands that never open
+    # it do not pay for loading tkinter.
+    if name == "MapEditor":
+        from .map_editor import MapEditor
+
+        return MapEditor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,35 @@
+"""Numba kernel finding the first vertex conflict between agent paths.
+
+Paths are passed as an ``(A, T)`` int64 matrix holding one key per agent and
+time step, each path padded with its final node. Shares the compilation
+options and the plain-Python fallback of :mod:`map_ten._ksp_numba`.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from ._ksp_numba import _OPTIONS, HAVE_NUMBA, njit
+
+__all__ = ["HAVE_NUMBA", "first_conflict"]
+
+_FIRST_CONFLICT_SIG = "UniTuple(i8, 3)(i8[:, ::1])"
+
+
+@njit(_FIRST_CONFLICT_SIG, **_OPTIONS)
+def first_conflict(keys):
+    """Return ``(first, second, t)`` for the earliest shared key, else ``-1``s.
+
+    At the earliest time step with a collision, ``second`` is the lowest row
+    whose key an earlier row already holds and ``first`` is that earlier row.
+    """
+
+    occupancy = {np.int64(0): np.int64(0)}
+    for t in range(keys.shape[1]):
+        occupancy.clear()
+        for a in range(keys.shape[0]):
+            other = occupancy.get(keys[a, t], np.int64(-1))
+            if other >= 0:
+                return other, np.int64(a), np.int64(t)
+            occupancy[keys[a, t]] = np.int64(a)
+    return np.int64(-1), np.int64(-1), np.int64(-1)
@@ -0,0 +1,274 @@
+"""Numba kernels for shortest and k-shortest paths on CSR graphs.
+
+The kernels work on the ``indptr``/``indices``/``weights`` arrays of a
+:class:`~map_ten.graph_builder.CSRGraph` and integer node ids. When Numba is
+not installed they run as plain Python functions.
+
+The kernels are compiled when this module is first imported and cached on
+disk; running ``python -c "import map_ten.mcf_solver"`` once after
+installation compiles these and the conflict and flow kernels in
+:mod:`map_ten._conflict_numba` and :mod:`map_ten._mcf_numba`, moving that
+cost out of the first ``plan`` invocation.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    from numba import njit
+
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - optional dependency
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+INF = np.iinfo(np.int64).max
+
+# Explicit signatures make Numba compile eagerly at import and, with
+# ``cache=True``, persist the machine code to ``__pycache__`` so later runs
+# skip JIT warm-up entirely. Graph arrays must be C-contiguous int32 and the
+# heuristic int64. Kernels only called from other kernels drop their CPython
+# wrapper to cut compile time.
+_OPTIONS = dict(cache=True, boundscheck=False)
+_INTERNAL = dict(_OPTIONS, no_cpython_wrapper=True)
+
+_HEAP_PUSH_SIG = "i8(i8[::1], i4[::1], i8, i8, i4)"
+_HEAP_POP_SIG = "Tuple((i4, i8))(i8[::1], i4[::1], i8)"
+_SEARCH_SIG = (
+    "Tuple((i8[::1], i4[::1]))"
+    "(i4[::1], i4[::1], i4[::1], i4, i4, i8[::1], b1[::1], b1[::1])"
+)
+_DIJKSTRA_SIG = "Tuple((i8[::1], i4[::1]))(i4[::1], i4[::1], i4[::1], i4, i4, i8[::1])"
+_TRACE_SIG = "i4[::1](i4[::1], i4, i4)"
+_EDGE_SLOT_SIG = "i8(i4[::1], i4[::1], i4, i4)"
+_SAME_PREFIX_SIG = "b1(i4[::1], i4[::1], i8)"
+_SAME_PATH_SIG = "b1(i4[::1], i4[::1])"
+_YEN_SIG = (
+    "List(i4[::1])"
+    "(i4[::1], i4[::1], i4[::1], i4, i4, i8, i8[::1])"
+)
+
+
+@njit(_HEAP_PUSH_SIG, **_INTERNAL)
+def _heap_push(keys, nodes, size, key, node):
+    i = size
+    keys[i] = key
+    nodes[i] = node
+    while i > 0:
+        parent = (i - 1) >> 1
+        if keys[parent] <= keys[i]:
+            break
+        keys[parent], keys[i] = keys[i], keys[parent]
+        nodes[parent], nodes[i] = nodes[i], nodes[parent]
+        i = parent
+    return size + 1
+
+
+@njit(_HEAP_POP_SIG, **_INTERNAL)
+def _heap_pop(keys, nodes, size):
+    node = nodes[0]
+    size -= 1
+    keys[0] = keys[size]
+    nodes[0] = nodes[size]
+    i = 0
+    while True:
+        left = 2 * i + 1
+        if left >= size:
+            break
+        child = left
+        if left + 1 < size and keys[left + 1] < keys[left]:
+            child = left + 1
+        if keys[i] <= keys[child]:
+            break
+        keys[child], keys[i] = keys[i], keys[child]
+        nodes[child], nodes[i] = nodes[i], nodes[child]
+        i = child
+    return node, size
+
+
+@njit(_SEARCH_SIG, **_INTERNAL)
+def _search(indptr, indices, weights, src, tgt, h, blocked_node, blocked_edge):
+    n = indptr.shape[0] - 1
+    dist = np.full(n, INF, dtype=np.int64)
+    pred = np.full(n, -1, dtype=np.int32)
+    done = np.zeros(n, dtype=np.bool_)
+    keys = np.empty(indices.shape[0] + 1, dtype=np.int64)
+    heap = np.empty(indices.shape[0] + 1, dtype=np.int32)
+
+    dist[src] = 0
+    size = _heap_push(keys, heap, 0, h[src], src)
+    while size > 0:
+        u, size = _heap_pop(keys, heap, size)
+        if done[u]:
+            continue
+        done[u] = True
+        if u == tgt:
+            break
+        for e in range(indptr[u], indptr[u + 1]):
+            if blocked_edge[e]:
+                continue
+            v = indices[e]
+            if blocked_node[v] or done[v]:
+                continue
+            nd = dist[u] + weights[e]
+            if nd < dist[v]:
+                dist[v] = nd
+                pred[v] = u
+                size = _heap_push(keys, heap, size, nd + h[v], v)
+    return dist, pred
+
+
+@njit(_DIJKSTRA_SIG, **_OPTIONS)
+def dijkstra(indptr, indices, weights, src, tgt, h):
+    """Return ``(dist, pred)`` of an A* search from ``src`` to ``tgt``.
+
+    ``h`` holds a consistent lower bound on the distance from every node to
+    ``tgt``; an all-zero array gives plain Dijkstra. Unreached nodes have
+    distance :data:`INF` and predecessor ``-1``.
+    """
+
+    blocked_node = np.zeros(indptr.shape[0] - 1, dtype=np.bool_)
+    blocked_edge = np.zeros(indices.shape[0], dtype=np.bool_)
+    return _search(indptr, indices, weights, src, tgt, h, blocked_node, blocked_edge)
+
+
+@njit(_TRACE_SIG, **_INTERNAL)
+def _trace(pred, src, tgt):
+    length = 1
+    node = tgt
+    while node != src:
+        node = pred[node]
+        length += 1
+    path = np.empty(length, dtype=np.int32)
+    node = tgt
+    for i in range(length - 1, -1, -1):
+        path[i] = node
+        node = pred[node]
+    return path
+
+
+@njit(_EDGE_SLOT_SIG, **_INTERNAL)
+def _edge_slot(indptr, indices, u, v):
+    for e in range(indptr[u], indptr[u + 1]):
+        if indices[e] == v:
+            return e
+    return -1
+
+
+@njit(_SAME_PREFIX_SIG, **_INTERNAL)
+def _same_prefix(a, b, length):
+    if a.shape[0] < length or b.shape[0] < length:
+        return False
+    for i in range(length):
+        if a[i] != b[i]:
+            return False
+    return True
+
+
+@njit(_SAME_PATH_SIG, **_INTERNAL)
+def _same_path(a, b):
+    return a.shape[0] == b.shape[0] and _same_prefix(a, b, a.shape[0])
+
+
+@njit(_YEN_SIG, **_OPTIONS)
+def yen(indptr, indices, weights, src, tgt, K, h):
+    """Return up to ``K`` shortest simple paths from ``src`` to ``tgt``.
+
+    Yen's algorithm with two standard refinements: spur searches start at the
+    deviation index of the path being expanded (Lawler), and the search stops
+    early once enough equal-cost candidates are queued to fill the result.
+    """
+
+    blocked_node = np.zeros(indptr.shape[0] - 1, dtype=np.bool_)
+    blocked_edge = np.zeros(indices.shape[0], dtype=np.bool_)
+    dist, pred = _search(
+        indptr, indices, weights, src, tgt, h, blocked_node, blocked_edge
+    )
+    if dist[tgt] == INF:
+        first = np.empty(0, dtype=np.int32)
+    else:
+        first = _trace(pred, src, tgt)
+    accepted = [first]
+    accepted_dev = [0]
+    if dist[tgt] == INF or K < 1:
+        accepted.pop()
+        return accepted
+
+    cand_paths = [first]
+    cand_cost = [np.int64(0)]
+    cand_dev = [0]
+    cand_paths.pop()
+    cand_cost.pop()
+    cand_dev.pop()
+
+    while len(accepted) < K:
+        prev = accepted[-1]
+        root_cost = np.zeros(prev.shape[0], dtype=np.int64)
+        for i in range(1, prev.shape[0]):
+            slot = _edge_slot(indptr, indices, prev[i - 1], prev[i])
+            root_cost[i] = root_cost[i - 1] + weights[slot]
+
+        for i in range(accepted_dev[-1], prev.shape[0] - 1):
+            spur = prev[i]
+            for path in accepted:
+                if path.shape[0] > i + 1 and _same_prefix(path, prev, i + 1):
+                    slot = _edge_slot(indptr, indices, spur, path[i + 1])
+                    blocked_edge[slot] = True
+            for j in range(i):
+                blocked_node[prev[j]] = True
+
+            d, p = _search(
+                indptr, indices, weights, spur, tgt, h, blocked_node, blocked_edge
+            )
+
+            blocked_edge[:] = False
+            for j in range(i):
+                blocked_node[prev[j]] = False
+
+            if d[tgt] == INF:
+                continue
+            spur_path = _trace(p, spur, tgt)
+            candidate = np.empty(i + spur_path.shape[0], dtype=np.int32)
+            candidate[:i] = prev[:i]
+            candidate[i:] = spur_path
+            duplicate = False
+            for other in cand_paths:
+                if _same_path(other, candidate):
+                    duplicate = True
+                    break
+            if not duplicate:
+                cand_paths.append(candidate)
+                cand_cost.append(root_cost[i] + d[tgt])
+                cand_dev.append(i)
+
+        if len(cand_paths) == 0:
+            break
+
+        best_cost = cand_cost[0]
+        for cost in cand_cost:
+            best_cost = min(best_cost, cost)
+        ties = 0
+        for cost in cand_cost:
+            if cost == best_cost:
+                ties += 1
+        take = 1 if ties < K - len(accepted) else K - len(accepted)
+        for _ in range(take):
+            best = 0
+            while cand_cost[best] != best_cost:
+                best += 1
+            # ``list.pop(i)`` on a list of arrays can release the popped array
+            # while it is still referenced in nopython mode, so shift the tail
+            # down and pop the last slot; candidate order is kept for ties.
+            accepted.append(cand_paths[best])
+            for j in range(best, len(cand_paths) - 1):
+                cand_paths[j] = cand_paths[j + 1]
+            cand_paths.pop()
+            accepted_dev.append(cand_dev.pop(best))
+            cand_cost.pop(best)
+    return accepted
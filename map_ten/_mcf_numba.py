@@ -0,0 +1,106 @@
+"""Numba kernels for unit min-cost flow on a CSR residual network.
+
+The network stores every edge next to its reverse: ``heads``, ``costs`` and
+``caps`` are indexed by CSR slot and ``rev[e]`` is the slot of the reverse of
+edge ``e``. Shares the compilation options, heap and plain-Python fallback of
+:mod:`map_ten._ksp_numba`.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from ._ksp_numba import _OPTIONS, HAVE_NUMBA, INF, _heap_pop, _heap_push, njit
+
+__all__ = ["HAVE_NUMBA", "extract_paths", "min_cost_flow"]
+
+_MIN_COST_FLOW_SIG = (
+    "i8(i4[::1], i4[::1], i8[::1], i4[::1], i8[::1], b1[::1], i4, i4, i8)"
+)
+_EXTRACT_PATHS_SIG = (
+    "Tuple((i4[:, ::1], i8[::1]))(i4[::1], i4[::1], i4[::1], i4[::1], i8)"
+)
+
+
+@njit(_MIN_COST_FLOW_SIG, **_OPTIONS)
+def min_cost_flow(indptr, heads, costs, caps, rev, blocked, source, sink, units):
+    """Send up to ``units`` of flow from ``source`` to ``sink`` at minimum cost.
+
+    Successive shortest paths with Dijkstra on reduced costs; edge costs
+    must be non-negative. ``caps`` is updated in place to the residual
+    capacities and nodes set in ``blocked`` are never entered. Returns the
+    number of units sent.
+    """
+
+    n = indptr.shape[0] - 1
+    potential = np.zeros(n, dtype=np.int64)
+    dist = np.empty(n, dtype=np.int64)
+    pred = np.empty(n, dtype=np.int64)
+    done = np.empty(n, dtype=np.bool_)
+    keys = np.empty(heads.shape[0] + 1, dtype=np.int64)
+    heap = np.empty(heads.shape[0] + 1, dtype=np.int32)
+
+    for sent in range(units):
+        dist[:] = INF
+        done[:] = False
+        dist[source] = 0
+        size = _heap_push(keys, heap, 0, 0, source)
+        while size > 0:
+            u, size = _heap_pop(keys, heap, size)
+            if done[u]:
+                continue
+            done[u] = True
+            for e in range(indptr[u], indptr[u + 1]):
+                if caps[e] == 0:
+                    continue
+                v = heads[e]
+                if blocked[v] or done[v]:
+                    continue
+                nd = dist[u] + costs[e] + potential[u] - potential[v]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    pred[v] = e
+                    size = _heap_push(keys, heap, size, nd, v)
+        if dist[sink] == INF:
+            return sent
+        # Nodes the search cannot reach now stay unreachable, so only the
+        # reached ones need their potential kept consistent.
+        for v in range(n):
+            if dist[v] < INF:
+                potential[v] += dist[v]
+        v = sink
+        while v != source:
+            e = pred[v]
+            caps[e] -= 1
+            caps[rev[e]] += 1
+            v = heads[rev[e]]
+    return units
+
+
+@njit(_EXTRACT_PATHS_SIG, **_OPTIONS)
+def extract_paths(indptr, heads, flow, starts, horizon):
+    """Follow unit flows from each of ``starts`` for up to ``horizon`` steps.
+
+    Each step takes the first edge in CSR order that still carries flow and
+    consumes one unit of it. Returns an ``(A, horizon + 1)`` node matrix
+    padded with ``-1`` and the length of every path.
+    """
+
+    paths = np.full((starts.shape[0], horizon + 1), -1, dtype=np.int32)
+    lengths = np.ones(starts.shape[0], dtype=np.int64)
+    for a in range(starts.shape[0]):
+        node = starts[a]
+        paths[a, 0] = node
+        for _ in range(horizon):
+            slot = -1
+            for e in range(indptr[node], indptr[node + 1]):
+                if flow[e] > 0:
+                    slot = e
+                    break
+            if slot < 0:
+                break
+            flow[slot] -= 1
+            node = heads[slot]
+            paths[a, lengths[a]] = node
+            lengths[a] += 1
+    return paths, lengths
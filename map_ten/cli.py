@@ -1,13 +1,132 @@
 from __future__ import annotations
 
 import argparse
-import json
 from pathlib import Path
 
-from .graph_builder import lines_to_graph
-from .map_editor import MapEditor
-from .map_io import load_map, save_paths, save_map, export_occupancy_grid
-from .mcf_solver import cbm_solve
+
+def _plan(args: argparse.Namespace) -> None:
+    from .graph_cache import load_graph, load_landmarks
+    from .map_io import load_plan_input, save_paths_stream
+    from .mcf_solver import cbm_solve_iter
+
+    lines, agents = load_plan_input(args.input)
+    graph, _pivot_dists = load_graph(lines, args.cache_dir)
+    # Without --alt the planner computes exact distances to the agents' goals;
+    # the cached landmark table only serves the dataset export.
+    landmarks = None if args.alt is None else load_landmarks(args.alt, graph)
+    paths = cbm_solve_iter(graph, agents, k=args.k, landmarks=landmarks)
+    save_paths_stream(paths, args.output)
+
+
+def _edit(args: argparse.Namespace) -> None:
+    from .map_editor import MapEditor
+
+    editor = MapEditor()
+    if getattr(args, "open", None):
+        editor.load(args.open)
+    elif getattr(args, "template", None):
+        editor.load_template(args.template)
+    editor.run()
+
+
+def _document_writer(fmt: str):
+    from .map_io import write_cbor, write_json
+
+    if fmt == "cbor":
+        return write_cbor, "cbor"
+    return write_json, "json"
+
+
+def _write_grid(data: dict, resolution: int, output: Path, fmt: str) -> None:
+    import numpy as np
+
+    from .map_io import export_occupancy_grid
+
+    grid = export_occupancy_grid(data, resolution)
+    np.save(output / "grid.npy", grid)
+    if fmt in {"json", "cbor", "both"}:
+        write, ext = _document_writer(fmt)
+        write({"grid": grid}, output / f"grid.{ext}")
+
+
+def _write_graph(
+    lines: list,
+    agents: dict,
+    output: Path,
+    fmt: str,
+    cache_dir: Path | None,
+    landmarks: int,
+) -> None:
+    import numpy as np
+
+    from .graph_builder import contract_degree2, csr_edge_weights, csr_edges
+    from .graph_cache import load_graph
+
+    graph, pivot_dists = load_graph(lines, cache_dir, landmarks)
+    edges = csr_edges(graph)
+    np.save(output / "alt.npy", pivot_dists)
+    if fmt in {"npz", "both"}:
+        index = {(x, y): i for i, (x, y) in enumerate(graph.node_xy.tolist())}
+        endpoints = {
+            index[tuple(spec[key])]
+            for spec in agents.values()
+            for key in ("start", "goal")
+            if tuple(spec.get(key, ())) in index
+        }
+        contracted = contract_degree2(graph, endpoints)
+        np.savez_compressed(
+            output / "graph.npz",
+            nodes=graph.node_xy,
+            edges=edges,
+            weights=csr_edge_weights(graph),
+            indptr=graph.indptr,
+            indices=graph.indices,
+            contracted_node_ids=contracted.node_ids,
+            contracted_indptr=contracted.graph.indptr,
+            contracted_indices=contracted.graph.indices,
+            contracted_weights=contracted.graph.weights,
+            contracted_via_indptr=contracted.via_indptr,
+            contracted_via_nodes=contracted.via_nodes,
+        )
+    if fmt in {"json", "cbor", "both"}:
+        write, ext = _document_writer(fmt)
+        graph_data = {"nodes": graph.node_xy, "edges": graph.node_xy[edges]}
+        write(graph_data, output / f"graph.{ext}")
+
+
+def _dataset(args: argparse.Namespace) -> None:
+    from .map_io import load_map, save_map
+
+    data = load_map(args.input)
+    args.output.mkdir(parents=True, exist_ok=True)
+    tasks = [
+        (save_map, data, args.output / "map.json"),
+        (_write_grid, data, args.resolution, args.output, args.format),
+        (
+            _write_graph,
+            data["lines"],
+            data.get("agents", {}),
+            args.output,
+            args.format,
+            args.cache_dir,
+            args.landmarks,
+        ),
+    ]
+    if args.jobs <= 1:
+        for func, *func_args in tasks:
+            func(*func_args)
+        return
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    # forkserver children start from a clean interpreter, so they only import
+    # the modules the writers need rather than inheriting the parent state.
+    context = multiprocessing.get_context("forkserver")
+    with ProcessPoolExecutor(max_workers=args.jobs, mp_context=context) as pool:
+        futures = [pool.submit(func, *func_args) for func, *func_args in tasks]
+        for future in futures:
+            future.result()
 
 
 def main() -> None:
@@ -15,6 +134,7 @@ def main() -> None:
     sub = parser.add_subparsers(dest="cmd")
 
     plan_p = sub.add_parser("plan", help="Plan paths and export to JSON")
+    plan_p.set_defaults(func=_plan)
     plan_p.add_argument("input", type=Path, help="Input map file (JSON/YAML)")
     plan_p.add_argument("output", type=Path, help="Output paths JSON file")
     plan_p.add_argument(
@@ -24,8 +144,24 @@ def main() -> None:
         dest="k",
         help="Number of k-shortest paths",
     )
+    plan_p.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Graph/heuristic cache directory (default ~/.cache/map_ten)",
+    )
+    plan_p.add_argument(
+        "--alt",
+        type=Path,
+        default=None,
+        help=(
+            "Landmark table (alt.npy) exported by the dataset command, used "
+            "instead of exact per-goal distances as the search heuristic"
+        ),
+    )
 
     edit_p = sub.add_parser("edit", help="Launch interactive map editor")
+    edit_p.set_defaults(func=_edit)
     edit_p.add_argument(
         "--open", dest="open", type=Path, help="Load map file on start"
     )
@@ -34,51 +170,54 @@ def main() -> None:
     )
 
     dataset_p = sub.add_parser(
-        "dataset", help="Export geometry, grid, and graph for training"
+        "dataset",
+        help="Export geometry, grid, and graph for training",
+        description=(
+            "Export map.json, grid.npy and alt.npy plus the graph. With the "
+            "npz format graph.npz holds int32 arrays nodes (N, 2) coordinates, "
+            "edges (E, 2) node ids, weights (E,), and the symmetric CSR "
+            "adjacency indptr (N + 1,) / indices (2E,). contracted_* arrays "
+            "hold the same graph with degree-2 corridors merged: node_ids maps "
+            "to original ids and via_indptr/via_nodes list the merged nodes of "
+            "each CSR slot."
+        ),
     )
+    dataset_p.set_defaults(func=_dataset)
     dataset_p.add_argument("input", type=Path, help="Input map file")
     dataset_p.add_argument("output", type=Path, help="Output dataset directory")
     dataset_p.add_argument(
         "--resolution", type=int, default=40, help="Grid cell size"
     )
+    dataset_p.add_argument(
+        "--format",
+        choices=("npz", "json", "cbor", "both"),
+        default="npz",
+        help="Graph encoding: npz arrays, json/cbor documents, or npz and json",
+    )
+    dataset_p.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Graph/heuristic cache directory (default ~/.cache/map_ten)",
+    )
+    dataset_p.add_argument(
+        "--landmarks",
+        type=int,
+        default=16,
+        help="Number of ALT landmarks stored in alt.npy",
+    )
+    dataset_p.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for writing the map, grid and graph in parallel",
+    )
 
     args = parser.parse_args()
-
-    if args.cmd == "plan":
-        data = load_map(args.input)
-        graph = lines_to_graph(data["lines"])
-        agents = {
-            name: (spec["start"], spec["goal"])
-            for name, spec in data.get("agents", {}).items()
-            if "start" in spec and "goal" in spec
-        }
-        paths = cbm_solve(graph, agents, k=args.k)
-        save_paths(paths, args.output)
-    elif args.cmd == "edit":
-        editor = MapEditor()
-        if getattr(args, "open", None):
-            editor.load(args.open)
-        elif getattr(args, "template", None):
-            editor.load_template(args.template)
-        editor.run()
-    elif args.cmd == "dataset":
-        data = load_map(args.input)
-        args.output.mkdir(parents=True, exist_ok=True)
-        save_map(data, args.output / "map.json")
-        grid = export_occupancy_grid(data, args.resolution)
-        (args.output / "grid.json").write_text(
-            json.dumps({"grid": grid}, indent=2)
-        )
-        graph = lines_to_graph(data["lines"])
-        graph_data = {
-            "nodes": [list(n) for n in graph.nodes()],
-            "edges": [list(e) for e in graph.edges()],
-        }
-        (args.output / "graph.json").write_text(
-            json.dumps(graph_data, indent=2)
-        )
-    else:
+    if not hasattr(args, "func"):
         parser.print_help()
+        return
+    args.func(args)
 
 
 if __name__ == "__main__":
@@ -1,18 +1,393 @@
 from __future__ import annotations
 
+import functools
+
 import networkx as nx
-from typing import List, Tuple
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+from typing import Any, Callable, Iterable, List, NamedTuple, Sequence, Tuple
+
+try:
+    import rustworkx as rx
+except ImportError:  # pragma: no cover - optional dependency
+    rx = None
+
+Coordinate = Tuple[int, int]
+Line = Tuple[Coordinate, Coordinate]
+
+_BIAS = 1 << 31
+_MASK = 0xFFFFFFFF
+
+
+class CSRGraph(NamedTuple):
+    """Undirected graph stored as a SciPy-style CSR adjacency.
+
+    ``indptr``, ``indices`` and ``weights`` describe the symmetric adjacency
+    matrix and ``node_xy`` maps each integer node id to its ``(x, y)``
+    coordinate.
+    """
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    weights: np.ndarray
+    node_xy: np.ndarray
+
+
+def _manhattan(arr: np.ndarray) -> np.ndarray:
+    """Return the int32 Manhattan length of each segment in an ``(E, 2, 2)`` array.
+
+    Uses the branchless ``(d ^ (d >> 31)) - (d >> 31)`` absolute value on the
+    int32 differences, which maps to straight-line integer SIMD.
+    """
+
+    d = arr[:, 0] - arr[:, 1]
+    sign = d >> 31
+    return ((d ^ sign) - sign).sum(axis=1, dtype=np.int32)
+
+
+def pack(x: int, y: int) -> int:
+    """Pack an int32 coordinate pair into a single non-negative integer key."""
+
+    return ((x + _BIAS) << 32) | ((y + _BIAS) & _MASK)
+
+
+def unpack(key: int) -> Coordinate:
+    """Inverse of :func:`pack`."""
+
+    return (key >> 32) - _BIAS, (key & _MASK) - _BIAS
+
+
+def pack_array(xy: np.ndarray) -> np.ndarray:
+    """Vectorised :func:`pack` of an ``(N, 2)`` coordinate array."""
+
+    xy = np.asarray(xy, dtype=np.int64) + _BIAS
+    return (xy[:, 0].astype(np.uint64) << np.uint64(32)) | xy[:, 1].astype(np.uint64)
 
-Line = Tuple[Tuple[int, int], Tuple[int, int]]
 
+def lines_to_graph(lines: List[Line], packed: bool = False) -> nx.Graph:
+    """Convert line segments into an undirected NetworkX graph.
 
-def lines_to_graph(lines: List[Line]) -> nx.Graph:
-    """Convert line segments into an undirected NetworkX graph."""
+    With ``packed`` the nodes are :func:`pack` keys instead of ``(x, y)``
+    tuples, which hash and compare faster in the path search loops.
 
+    Graphs are cached per geometry, so the result is frozen and shared between
+    callers; use ``nx.Graph(graph)`` for a mutable copy and :func:`invalidate`
+    to drop the cache.
+    """
+
+    key = tuple((x1, y1, x2, y2) for (x1, y1), (x2, y2) in lines)
+    return _lines_to_graph_cached(key, packed)
+
+
+def invalidate() -> None:
+    """Drop all graphs cached by :func:`lines_to_graph`."""
+
+    _lines_to_graph_cached.cache_clear()
+
+
+@functools.lru_cache(maxsize=8)
+def _lines_to_graph_cached(
+    lines: Tuple[Tuple[int, int, int, int], ...], packed: bool
+) -> nx.Graph:
+    arr = np.asarray(lines, dtype=np.int32).reshape(-1, 2, 2)
+    weights = _manhattan(arr).tolist()
+    if packed:
+        keys = pack_array(arr.reshape(-1, 2)).tolist()
+        us, vs = keys[0::2], keys[1::2]
+    else:
+        us = [(x, y) for x, y in arr[:, 0].tolist()]
+        vs = [(x, y) for x, y in arr[:, 1].tolist()]
     graph = nx.Graph()
-    for (x1, y1), (x2, y2) in lines:
-        u = (x1, y1)
-        v = (x2, y2)
-        weight = abs(x1 - x2) + abs(y1 - y2)
-        graph.add_edge(u, v, weight=weight)
-    return graph
\ No newline at end of file
+    graph.add_weighted_edges_from(zip(us, vs, weights))
+    return nx.freeze(graph)
+
+
+def lines_to_csr(lines: Sequence[Line] | np.ndarray) -> CSRGraph:
+    """Convert line segments into a CSR adjacency with integer node ids.
+
+    ``lines`` may be a list of segments or an ``(E, 2, 2)`` array. Coincident
+    endpoints share a node id and repeated segments collapse into a single
+    edge, as with :func:`lines_to_graph`. Zero-length segments only contribute
+    their node.
+    """
+
+    arr = np.asarray(lines, dtype=np.int32).reshape(-1, 2, 2)
+    node_xy, inv = np.unique(arr.reshape(-1, 2), axis=0, return_inverse=True)
+    inv = inv.reshape(-1).astype(np.int32)
+    u, v = inv[0::2], inv[1::2]
+    w = _manhattan(arr)
+
+    n = len(node_xy)
+    key = np.minimum(u, v).astype(np.int64) * n + np.maximum(u, v)
+    _, first = np.unique(key, return_index=True)
+    first = first[u[first] != v[first]]
+    u, v, w = u[first], v[first], w[first]
+
+    adj = sparse.coo_matrix(
+        (np.concatenate([w, w]), (np.concatenate([u, v]), np.concatenate([v, u]))),
+        shape=(n, n),
+    ).tocsr()
+    adj.sort_indices()
+    return CSRGraph(
+        adj.indptr.astype(np.int32),
+        adj.indices.astype(np.int32),
+        adj.data.astype(np.int32),
+        node_xy.astype(np.int32),
+    )
+
+
+def _csr_rows(graph: CSRGraph) -> np.ndarray:
+    return np.repeat(
+        np.arange(len(graph.indptr) - 1, dtype=np.int32), np.diff(graph.indptr)
+    )
+
+
+def lines_to_rx_graph(lines: Sequence[Line] | np.ndarray) -> "rx.PyGraph":
+    """Convert line segments into a ``rustworkx.PyGraph``.
+
+    Node indices match the ids of :func:`lines_to_csr` and each node payload
+    is its ``(x, y)`` tuple, so ``graph.nodes()`` yields coordinates and
+    ``graph.weighted_edge_list()`` yields ``(u, v, weight)`` id triples.
+    Requires the optional ``rustworkx`` package; :func:`lines_to_graph`
+    remains the NetworkX-based default.
+    """
+
+    if rx is None:
+        raise ImportError("lines_to_rx_graph requires the rustworkx package")
+    csr = lines_to_csr(lines)
+    graph = rx.PyGraph(multigraph=False)
+    graph.add_nodes_from([(x, y) for x, y in csr.node_xy.tolist()])
+    graph.extend_from_weighted_edge_list(
+        [
+            (u, v, w)
+            for (u, v), w in zip(
+                csr_edges(csr).tolist(), csr_edge_weights(csr).tolist()
+            )
+        ]
+    )
+    return graph
+
+
+def csr_edges(graph: CSRGraph) -> np.ndarray:
+    """Return the ``(E, 2)`` node id pairs of ``graph`` with ``u < v``."""
+
+    rows = _csr_rows(graph)
+    upper = rows < graph.indices
+    return np.stack([rows[upper], graph.indices[upper]], axis=1)
+
+
+def csr_edge_weights(graph: CSRGraph) -> np.ndarray:
+    """Return the weights of the edges listed by :func:`csr_edges`."""
+
+    return graph.weights[_csr_rows(graph) < graph.indices]
+
+
+def to_scipy(graph: CSRGraph) -> sparse.csr_matrix:
+    """Wrap ``graph`` in a :class:`scipy.sparse.csr_matrix` without copying."""
+
+    n = len(graph.node_xy)
+    return sparse.csr_matrix(
+        (graph.weights, graph.indices, graph.indptr), shape=(n, n)
+    )
+
+
+def landmark_distances(graph: CSRGraph, count: int = 16) -> np.ndarray:
+    """Return ``(L, N)`` shortest distances from ``count`` landmark nodes.
+
+    Landmarks are chosen by farthest-point sampling so they spread over the
+    map and every connected component. Unreachable nodes are stored as ``-1``.
+    The table costs ``4 * L * N`` bytes and ``L`` Dijkstra runs to build;
+    more landmarks give a tighter A* bound but make each evaluation ``O(L)``.
+    """
+
+    n = len(graph.node_xy)
+    count = min(count, n)
+    adj = to_scipy(graph)
+    dists = np.empty((count, n), dtype=np.int32)
+    nearest = np.full(n, np.inf)
+    landmark = 0
+    for i in range(count):
+        d = csgraph.dijkstra(adj, indices=landmark)
+        dists[i] = np.where(np.isfinite(d), d, -1)
+        nearest = np.minimum(nearest, d)
+        landmark = int(np.argmax(nearest))
+    return dists
+
+
+def landmark_heuristic(
+    graph: CSRGraph, dists: np.ndarray, packed: bool = False
+) -> Callable[[Any, Any], int]:
+    """Build the admissible ALT heuristic ``max_l |d(l, u) - d(l, v)|``.
+
+    With ``packed`` the heuristic expects :func:`pack` keys as nodes.
+    """
+
+    keys = graph.node_xy.tolist()
+    if packed:
+        index = {pack(x, y): i for i, (x, y) in enumerate(keys)}
+    else:
+        index = {(x, y): i for i, (x, y) in enumerate(keys)}
+
+    def heuristic(u: Any, v: Any) -> int:
+        du = dists[:, index[u]]
+        dv = dists[:, index[v]]
+        known = (du >= 0) & (dv >= 0)
+        return int(np.abs(du - dv)[known].max(initial=0))
+
+    return heuristic
+
+
+def landmark_lower_bounds(dists: np.ndarray, goal: int) -> np.ndarray:
+    """Return the ALT lower bound from every node to node id ``goal``."""
+
+    if len(dists) == 0:
+        return np.zeros(dists.shape[1], dtype=np.int64)
+    to_goal = dists[:, goal : goal + 1]
+    known = (dists >= 0) & (to_goal >= 0)
+    return np.where(known, np.abs(dists - to_goal), 0).max(axis=0).astype(np.int64)
+
+
+def goal_distances(graph: CSRGraph, goals: Sequence[int]) -> np.ndarray:
+    """Return ``(G, N)`` exact distances from every node to each of ``goals``.
+
+    All goals are solved in one batched :func:`scipy.sparse.csgraph.dijkstra`
+    call; the graph is undirected, so distances from a goal equal distances to
+    it. Each row is a perfect A* heuristic for its goal. Nodes that cannot
+    reach a goal get ``0``, which such searches never expand.
+    """
+
+    if len(goals) == 0:
+        return np.zeros((0, len(graph.node_xy)), dtype=np.int64)
+    d = csgraph.dijkstra(to_scipy(graph), indices=np.asarray(goals))
+    return np.where(np.isfinite(d), d, 0).astype(np.int64).reshape(len(goals), -1)
+
+
+class ContractedGraph(NamedTuple):
+    """A :class:`CSRGraph` with its degree-2 chains folded into single edges.
+
+    ``node_ids`` maps each contracted node to its id in the original graph.
+    The original interior nodes crossed by CSR slot ``e`` of ``graph`` are
+    ``via_nodes[via_indptr[e]:via_indptr[e + 1]]``, in travel order.
+    """
+
+    graph: CSRGraph
+    node_ids: np.ndarray
+    via_indptr: np.ndarray
+    via_nodes: np.ndarray
+
+
+def contract_degree2(graph: CSRGraph, keep: Iterable[int] = ()) -> ContractedGraph:
+    """Merge every chain of degree-2 nodes into one weighted edge.
+
+    Nodes listed in ``keep`` (e.g. agent starts and goals) are never merged.
+    A chain is only partly contracted where merging it fully would create a
+    self-loop or a parallel edge, so simple paths in the contracted graph map
+    one-to-one onto simple paths in the original and keep their weights.
+    """
+
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    weights = graph.weights.tolist()
+    n = len(indptr) - 1
+    kept = (np.diff(graph.indptr) != 2).tolist()
+    for node in keep:
+        kept[node] = True
+    visited = list(kept)
+
+    edges: List[Tuple[int, int, int, List[int]]] = []
+    seen = set()
+    for u in range(n):
+        if kept[u]:
+            for e in range(indptr[u], indptr[u + 1]):
+                v = indices[e]
+                if kept[v] and u < v:
+                    edges.append((u, v, weights[e], []))
+                    seen.add((u, v))
+
+    def add_chain(u: int, end: int, w: int, via: List[int]) -> None:
+        edges.append((u, end, w, via) if u < end else (end, u, w, via[::-1]))
+        seen.add((min(u, end), max(u, end)))
+
+    for u in range(n):
+        if not kept[u]:
+            continue
+        for e in range(indptr[u], indptr[u + 1]):
+            v = indices[e]
+            if visited[v]:
+                continue
+            prev, cur, via, steps = u, v, [], [weights[e]]
+            while not kept[cur]:
+                visited[cur] = True
+                via.append(cur)
+                a, b = indptr[cur], indptr[cur] + 1
+                slot = b if indices[a] == prev else a
+                prev, cur = cur, indices[slot]
+                steps.append(weights[slot])
+            if cur == u:
+                # A loop back to ``u``: keep both ends of the chain.
+                first, last = via[0], via[-1]
+                kept[first] = kept[last] = True
+                edges.append((min(u, first), max(u, first), steps[0], []))
+                edges.append((min(u, last), max(u, last), steps[-1], []))
+                if len(via) == 2:
+                    edges.append((min(first, last), max(first, last), steps[1], []))
+                else:
+                    add_chain(first, last, sum(steps[1:-1]), via[1:-1])
+            elif (min(u, cur), max(u, cur)) in seen:
+                # A parallel route: keep its first interior node.
+                first = via[0]
+                kept[first] = True
+                edges.append((min(u, first), max(u, first), steps[0], []))
+                add_chain(first, cur, sum(steps[1:]), via[1:])
+            else:
+                add_chain(u, cur, sum(steps), via)
+
+    # Rings without any kept node stay as they are.
+    for u in range(n):
+        if not visited[u]:
+            kept[u] = True
+            for e in range(indptr[u], indptr[u + 1]):
+                if u < indices[e]:
+                    edges.append((u, indices[e], weights[e], []))
+
+    node_ids = np.flatnonzero(kept).astype(np.int32)
+    local = {orig: i for i, orig in enumerate(node_ids.tolist())}
+    slots = []
+    for u, v, w, via in edges:
+        slots.append((local[u], local[v], w, via))
+        slots.append((local[v], local[u], w, via[::-1]))
+    slots.sort(key=lambda s: (s[0], s[1]))
+
+    m = len(node_ids)
+    rows = np.array([s[0] for s in slots], dtype=np.int32)
+    via_lengths = [len(s[3]) for s in slots]
+    via_indptr = np.zeros(len(slots) + 1, dtype=np.int32)
+    np.cumsum(via_lengths, out=via_indptr[1:])
+    contracted = CSRGraph(
+        np.searchsorted(rows, np.arange(m + 1), side="left").astype(np.int32),
+        np.array([s[1] for s in slots], dtype=np.int32),
+        np.array([s[2] for s in slots], dtype=np.int32),
+        graph.node_xy[node_ids],
+    )
+    via_nodes = np.array(
+        [node for s in slots for node in s[3]], dtype=np.int32
+    )
+    return ContractedGraph(contracted, node_ids, via_indptr, via_nodes)
+
+
+def expand_path(contracted: ContractedGraph, path: Sequence[int]) -> List[int]:
+    """Map a path of contracted node ids back to original node ids."""
+
+    graph = contracted.graph
+    node_ids = contracted.node_ids.tolist()
+    expanded: List[int] = []
+    for u, v in zip(path[:-1], path[1:]):
+        start, stop = graph.indptr[u], graph.indptr[u + 1]
+        slot = start + int(np.flatnonzero(graph.indices[start:stop] == v)[0])
+        expanded.append(node_ids[u])
+        lo, hi = contracted.via_indptr[slot], contracted.via_indptr[slot + 1]
+        expanded.extend(contracted.via_nodes[lo:hi].tolist())
+    if len(path):
+        expanded.append(node_ids[path[-1]])
+    return expanded
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from .graph_builder import CSRGraph, Line, landmark_distances, lines_to_csr
+
+_CACHE_VERSION = b"map_ten-graph-v1"
+
+
+def default_cache_dir() -> Path:
+    """Return ``$XDG_CACHE_HOME/map_ten`` (``~/.cache/map_ten`` by default)."""
+
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "map_ten"
+
+
+def lines_key(lines: Sequence[Line] | np.ndarray, landmarks: int = 16) -> str:
+    """Return a content hash identifying ``lines`` and the landmark count."""
+
+    arr = np.ascontiguousarray(np.asarray(lines, dtype=np.int32).reshape(-1, 2, 2))
+    digest = hashlib.blake2b(_CACHE_VERSION, digest_size=16)
+    digest.update(landmarks.to_bytes(4, "little"))
+    digest.update(arr.tobytes())
+    return digest.hexdigest()
+
+
+def load_graph(
+    lines: Sequence[Line] | np.ndarray,
+    cache_dir: str | Path | None = None,
+    landmarks: int = 16,
+) -> Tuple[CSRGraph, np.ndarray]:
+    """Return the CSR graph and landmark distances for ``lines``.
+
+    Results are memoised in ``cache_dir`` as ``<hash>.npz`` so repeated runs
+    on the same map skip graph construction and landmark preprocessing.
+    """
+
+    directory = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+    file_path = directory / f"{lines_key(lines, landmarks)}.npz"
+    if file_path.exists():
+        with np.load(file_path) as cached:
+            graph = CSRGraph(
+                cached["indptr"],
+                cached["indices"],
+                cached["weights"],
+                cached["node_xy"],
+            )
+            return graph, cached["pivot_dists"]
+
+    graph = lines_to_csr(lines)
+    pivot_dists = landmark_distances(graph, landmarks)
+    directory.mkdir(parents=True, exist_ok=True)
+    # Each writer gets its own temporary file, so concurrent runs on the same
+    # map cannot interleave; whichever finishes last replaces the entry.
+    with tempfile.NamedTemporaryFile(
+        dir=directory, prefix=f".{file_path.stem}.", suffix=".tmp", delete=False
+    ) as f:
+        try:
+            np.savez(f, pivot_dists=pivot_dists, **graph._asdict())
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, file_path)
+    return graph, pivot_dists
+
+
+def load_landmarks(path: str | Path, graph: CSRGraph) -> np.ndarray:
+    """Load an ``alt.npy`` landmark table written by the dataset command."""
+
+    dists = np.load(path)
+    if dists.ndim != 2 or dists.shape[1] != len(graph.node_xy):
+        raise ValueError(
+            f"Landmark table {path} has shape {dists.shape}, "
+            f"expected (L, {len(graph.node_xy)})"
+        )
+    return dists.astype(np.int32, copy=False)
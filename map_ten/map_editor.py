@@ -1,19 +1,132 @@
 from __future__ import annotations
 
+import itertools
+import math
+import re
 import tkinter as tk
 from tkinter import filedialog, simpledialog, colorchooser
-from typing import Any, Dict, List, Tuple
-from dataclasses import dataclass
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Set, Tuple
+from dataclasses import dataclass, field
 from pathlib import Path
 
+import numpy as np
+
 from .map_io import load_map, save_map
 
 
+# Canvas tags of layers are numbered rather than derived from the name, which
+# would be read as a tag expression if it contained ``&&``, ``!``, ``(`` etc.
+_LAYER_IDS = itertools.count()
+
+
 @dataclass
 class Layer:
     name: str
     color: str
     visible: bool = True
+    # Stays the same across renames; not part of the saved map.
+    tag: str = field(
+        default_factory=lambda: f"layer::{next(_LAYER_IDS)}",
+        init=False,
+        repr=False,
+        compare=False,
+    )
+
+
+_GRID_MIN_STEP = 8  # pixels
+_GRID_SLACK = 2  # viewports drawn past each edge of the visible area
+
+# One ``key=value`` pair per comma-separated field, both sides stripped; the
+# value keeps any further ``=`` and fields without one are ignored.
+_ATTR_RE = re.compile(r"(?:^|(?<=,))\s*([^=,]*?)\s*=\s*([^,]*?)\s*(?=,|$)")
+
+# Undo steps are grouped into buckets so the history is a short deque of
+# lists; once it holds ``_HISTORY_BUCKETS`` buckets the oldest is dropped.
+_HISTORY_BUCKET = 20
+_HISTORY_BUCKETS = 500
+# Canvas items created per idle callback while a map is loading.
+_LOAD_CHUNK = 500
+# Tcl lambda creating one canvas item per coordinate list with the matching
+# option list, returning the item ids. Where ``reuse`` holds an id, that
+# pooled item is moved and reconfigured instead of creating a new one.
+_BATCH_ITEMS = """{w type coords options reuse} {
+    set ids {}
+    foreach xy $coords opts $options id $reuse {
+        if {$id eq ""} {
+            set id [$w create $type {*}$xy {*}$opts]
+        } else {
+            $w coords $id {*}$xy
+            $w itemconfigure $id {*}$opts
+        }
+        lappend ids $id
+    }
+    return $ids
+}"""
+# Tag of hidden element items kept by ``clear`` for the next load to reuse.
+_POOL_TAG = "pool"
+
+
+@dataclass
+class _HistoryBucket:
+    ops: List[Tuple[str, int, Any]] = field(default_factory=list)
+
+
+class _Rows:
+    """Growable ``(N, width)`` integer table with amortised O(1) appends.
+
+    Rows are stored as ``dtype`` and the table widens itself to int32 the
+    first time a value outside that range is written.
+    """
+
+    def __init__(self, width: int, dtype: Any = np.int32) -> None:
+        self._data = np.zeros((16, width), dtype=dtype)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def array(self) -> np.ndarray:
+        return self._data[: self._size]
+
+    def __getitem__(self, index: Any) -> np.ndarray:
+        return self.array[index]
+
+    def __setitem__(self, index: Any, row: Any) -> None:
+        self._fit(row)
+        self.array[index] = row
+
+    def _fit(self, values: Any) -> None:
+        if self._data.dtype == np.int32:
+            return
+        values = np.asarray(values)
+        info = np.iinfo(self._data.dtype)
+        if values.size and (values.min() < info.min or values.max() > info.max):
+            self._data = self._data.astype(np.int32)
+
+    def _reserve(self, needed: int) -> None:
+        if needed > len(self._data):
+            capacity = max(needed, 2 * len(self._data))
+            grown = np.zeros((capacity, self._data.shape[1]), self._data.dtype)
+            grown[: self._size] = self._data[: self._size]
+            self._data = grown
+
+    def append(self, row: Any) -> None:
+        self._fit(row)
+        self._reserve(self._size + 1)
+        self._data[self._size] = row
+        self._size += 1
+
+    def extend(self, rows: np.ndarray) -> None:
+        self._fit(rows)
+        needed = self._size + len(rows)
+        self._reserve(needed)
+        self._data[self._size : needed] = rows
+        self._size = needed
+
+    def clear(self) -> None:
+        self._size = 0
 
 
 class MapEditor:
@@ -71,6 +184,14 @@ class MapEditor:
 
         self.grid_size = 40
         self.zoom = 1.0
+        self._zoom_pending = 1.0
+        self._zoom_after: str | None = None
+        self._grid_after: str | None = None
+        self._grid_bounds: Tuple[float, ...] | None = None
+        self._grid_redraw_after: str | None = None
+        self._items_dirty = True
+        self._scroll_bbox: Tuple[int, ...] | None = None
+        self._scroll_scale = 1.0
         self.grid_var = tk.IntVar(value=self.grid_size)
         tk.Label(toolbar, text="Grid:").pack(side=tk.LEFT, padx=(10, 0))
         grid_entry = tk.Entry(toolbar, textvariable=self.grid_var, width=4)
@@ -78,17 +199,22 @@ class MapEditor:
         grid_entry.bind("<Return>", lambda _e: self.update_grid())
         self.show_grid = tk.BooleanVar(value=True)
         tk.Checkbutton(
-            toolbar, text="Show Grid", variable=self.show_grid, command=self.update_grid
+            toolbar,
+            text="Show Grid",
+            variable=self.show_grid,
+            command=self._schedule_grid_redraw,
         ).pack(side=tk.LEFT)
         self.draw_grid()
 
         tk.Label(toolbar, text="Layer:").pack(side=tk.LEFT, padx=(10, 0))
         self.layers: List[Layer] = [Layer("Default", "#000000")]
+        self._layer_by_name: Dict[str, Layer] = {self.layers[0].name: self.layers[0]}
         self.layer_var = tk.StringVar(value=self.layers[0].name)
         self.layer_menu = tk.OptionMenu(
             toolbar, self.layer_var, *(layer.name for layer in self.layers)
         )
         self.layer_menu.pack(side=tk.LEFT)
+        self._layer_menu_index: Dict[str, int] = {self.layers[0].name: 0}
         tk.Button(toolbar, text="Layers", command=self.manage_layers).pack(
             side=tk.LEFT
         )
@@ -96,55 +222,85 @@ class MapEditor:
             side=tk.LEFT
         )
 
-        self.lines: List[Tuple[Tuple[int, int], Tuple[int, int]]] = []
-        self.line_meta: List[Dict[str, Any]] = []
-        self.nodes: List[Tuple[int, int]] = []
-        self.node_meta: List[Dict[str, Any]] = []
-        self.obstacles: List[Tuple[int, int, int, int]] = []
-        self.obstacle_meta: List[Dict[str, Any]] = []
+        # Geometry lives in integer row tables (``x1, y1, x2, y2`` for lines
+        # and obstacles, ``x, y`` for nodes); nodes and obstacles start as
+        # int16. Metadata is keyed by element id.
+        # Deleting an element only drops its id, leaving its row unused, so
+        # no other element is renumbered.
+        self.lines_xy = _Rows(4)
+        self.line_meta: Dict[int, Dict[str, Any]] = {}
+        self.nodes_xy = _Rows(2, np.int16)
+        self.node_meta: Dict[int, Dict[str, Any]] = {}
+        self.obstacles_xy = _Rows(4, np.int16)
+        self.obstacle_meta: Dict[int, Dict[str, Any]] = {}
         self.agents: Dict[str, Dict[str, Tuple[int, int]]] = {}
-        self.history: List[Tuple[str, int, Any]] = []
+        self.history: Deque[_HistoryBucket] = deque(maxlen=_HISTORY_BUCKETS)
         self.item_map: Dict[int, Tuple[str, Any]] = {}
-        self.layer_items: Dict[str, List[int]] = {self.layers[0].name: []}
+        # Canvas items map to the stable ``id`` stamped into their metadata;
+        # these resolve an id to its row in the geometry tables.
+        self._line_by_id: Dict[int, int] = {}
+        self._node_by_id: Dict[int, int] = {}
+        self._obstacle_by_id: Dict[int, int] = {}
+        self.layer_items: Dict[str, Set[int]] = {self.layers[0].name: set()}
         self.next_id = 1
 
         self._line_start: Tuple[int, int] | None = None
         self._rect_start: Tuple[int, int] | None = None
         self.selected_item: int | None = None
         self._drag_start: Tuple[int, int] | None = None
+        self._pending_move = [0, 0]
+        self._move_after: str | None = None
+        self._load_iter: Iterator[bool] | None = None
+        self._load_after: str | None = None
+        self._item_pool: Dict[str, List[int]] = {
+            "line": [],
+            "node": [],
+            "obstacle": [],
+        }
 
         self.canvas.bind("<Button-1>", self.on_click)
         self.canvas.bind("<B1-Motion>", self.on_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_release)
         self.canvas.bind("<MouseWheel>", self.on_zoom)
         self.canvas.bind("<Button-2>", lambda e: self.canvas.scan_mark(e.x, e.y))
-        self.canvas.bind(
-            "<B2-Motion>", lambda e: self.canvas.scan_dragto(e.x, e.y, gain=1)
-        )
+        self.canvas.bind("<B2-Motion>", self.on_pan)
         self.canvas.bind("<ButtonRelease-2>", lambda _e: self.draw_grid())
 
     def refresh_layer_menu(self) -> None:
         menu = self.layer_menu["menu"]
         menu.delete(0, "end")
+        self._layer_menu_index.clear()
         for layer in self.layers:
-            menu.add_command(
-                label=layer.name, command=lambda n=layer.name: self.layer_var.set(n)
-            )
+            self._menu_add(layer.name)
+
+    def _menu_add(self, name: str) -> None:
+        menu = self.layer_menu["menu"]
+        menu.add_command(label=name, command=lambda n=name: self.layer_var.set(n))
+        self._layer_menu_index.setdefault(name, menu.index("end"))
+
+    def _menu_rename(self, old: str, new: str) -> None:
+        index = self._layer_menu_index.pop(old, None)
+        if index is None:
+            self._menu_add(new)
+            return
+        self.layer_menu["menu"].entryconfigure(
+            index, label=new, command=lambda n=new: self.layer_var.set(n)
+        )
+        self._layer_menu_index.setdefault(new, index)
 
     def get_layer(self, name: str) -> Layer:
-        for layer in self.layers:
-            if layer.name == name:
-                return layer
-        return self.layers[0]
+        return self._layer_by_name.get(name, self.layers[0])
 
     def add_layer(self) -> None:
         name = simpledialog.askstring("Layer", "Name:", parent=self.root)
         if not name:
             return
         color = colorchooser.askcolor()[1] or "#000000"
-        self.layers.append(Layer(name, color))
-        self.layer_items[name] = []
-        self.refresh_layer_menu()
+        layer = Layer(name, color)
+        self.layers.append(layer)
+        self._layer_by_name.setdefault(name, layer)
+        self.layer_items[name] = set()
+        self._menu_add(name)
 
     def rename_layer(self, layer: Layer) -> None:
         new = simpledialog.askstring(
@@ -154,48 +310,44 @@ class MapEditor:
             return
         old = layer.name
         layer.name = new
+        if self._layer_by_name.get(old) is layer:
+            del self._layer_by_name[old]
+        self._layer_by_name.setdefault(new, layer)
         if self.layer_var.get() == old:
             self.layer_var.set(new)
         self.layer_items[new] = self.layer_items.pop(old)
-        for meta in self.line_meta:
+        for meta in self.line_meta.values():
             if meta["layer"] == old:
                 meta["layer"] = new
-        for meta in self.node_meta:
+        for meta in self.node_meta.values():
             if meta["layer"] == old:
                 meta["layer"] = new
-        for meta in self.obstacle_meta:
+        for meta in self.obstacle_meta.values():
             if meta["layer"] == old:
                 meta["layer"] = new
-        self.refresh_layer_menu()
+        self._menu_rename(old, new)
 
     def change_layer_color(self, layer: Layer) -> None:
         color = colorchooser.askcolor(color=layer.color)[1]
         if not color:
             return
         layer.color = color
-        for item in self.layer_items.get(layer.name, []):
-            kind, _ = self.item_map.get(item, (None, None))
-            if kind == "line":
-                self.canvas.itemconfigure(item, fill=color)
-            elif kind == "node":
-                self.canvas.itemconfigure(item, fill=color)
-            elif kind == "obstacle":
-                self.canvas.itemconfigure(item, outline=color, fill=color)
-        for meta in self.line_meta:
+        self.canvas.itemconfigure(layer.tag, fill=color)
+        self.canvas.itemconfigure(f"{layer.tag}&&obstacle", outline=color)
+        for meta in self.line_meta.values():
             if meta["layer"] == layer.name:
                 meta.setdefault("style", {})["color"] = color
-        for meta in self.node_meta:
+        for meta in self.node_meta.values():
             if meta["layer"] == layer.name:
                 meta.setdefault("style", {})["color"] = color
-        for meta in self.obstacle_meta:
+        for meta in self.obstacle_meta.values():
             if meta["layer"] == layer.name:
                 meta.setdefault("style", {})["fill"] = color
 
     def set_layer_visibility(self, layer: Layer, visible: bool) -> None:
         layer.visible = visible
         state = tk.NORMAL if visible else tk.HIDDEN
-        for item in self.layer_items.get(layer.name, []):
-            self.canvas.itemconfigure(item, state=state)
+        self.canvas.itemconfigure(layer.tag, state=state)
 
     def manage_layers(self) -> None:
         win = tk.Toplevel(self.root)
@@ -245,14 +397,9 @@ class MapEditor:
         result = simpledialog.askstring(
             "Attributes", "key=value,...", initialvalue=current, parent=self.root
         )
-        if result is None:
+        if result is None or result == current:
             return
-        attrs: Dict[str, Any] = {}
-        for pair in result.split(","):
-            if "=" in pair:
-                k, v = pair.split("=", 1)
-                attrs[k.strip()] = v.strip()
-        meta["attributes"] = attrs
+        meta["attributes"] = dict(_ATTR_RE.findall(result))
     def to_world(self, x: float, y: float) -> Tuple[float, float]:
         return self.canvas.canvasx(x) / self.zoom, self.canvas.canvasy(y) / self.zoom
 
@@ -285,20 +432,19 @@ class MapEditor:
                     sy,
                     fill=layer.color,
                     state=tk.NORMAL if layer.visible else tk.HIDDEN,
+                    tags=(layer.tag, "line"),
                 )
-                self.lines.append((self._line_start, (x, y)))
-                self.line_meta.append(
-                    {
-                        "id": self.next_id,
-                        "layer": layer.name,
-                        "attributes": {},
-                        "style": {"color": layer.color},
-                    }
-                )
-                index = len(self.lines) - 1
-                self.layer_items.setdefault(layer.name, []).append(item)
-                self.item_map[item] = ("line", index)
-                self.history.append(("line", item, None))
+                self.lines_xy.append((*self._line_start, x, y))
+                self.line_meta[self.next_id] = {
+                    "id": self.next_id,
+                    "layer": layer.name,
+                    "attributes": {},
+                    "style": {"color": layer.color},
+                }
+                self._line_by_id[self.next_id] = len(self.lines_xy) - 1
+                self.layer_items.setdefault(layer.name, set()).add(item)
+                self.item_map[item] = ("line", self.next_id)
+                self._push_history("line", item, None)
                 self.next_id += 1
                 self._line_start = None
         elif mode == "node":
@@ -311,19 +457,19 @@ class MapEditor:
                 sy + r,
                 fill=layer.color,
                 state=tk.NORMAL if layer.visible else tk.HIDDEN,
+                tags=(layer.tag, "node"),
             )
-            self.nodes.append((x, y))
-            self.node_meta.append(
-                {
-                    "id": self.next_id,
-                    "layer": layer.name,
-                    "attributes": {},
-                    "style": {"color": layer.color},
-                }
-            )
-            self.layer_items.setdefault(layer.name, []).append(item)
-            self.item_map[item] = ("node", len(self.nodes) - 1)
-            self.history.append(("node", item, None))
+            self.nodes_xy.append((x, y))
+            self.node_meta[self.next_id] = {
+                "id": self.next_id,
+                "layer": layer.name,
+                "attributes": {},
+                "style": {"color": layer.color},
+            }
+            self._node_by_id[self.next_id] = len(self.nodes_xy) - 1
+            self.layer_items.setdefault(layer.name, set()).add(item)
+            self.item_map[item] = ("node", self.next_id)
+            self._push_history("node", item, None)
             self.next_id += 1
         elif mode == "obstacle":
             self._rect_start = (x, y)
@@ -341,7 +487,7 @@ class MapEditor:
                 )
                 self.agents.setdefault(name, {})[mode] = (x, y)
                 self.item_map[item] = (mode, name)
-                self.history.append((mode, item, name))
+                self._push_history(mode, item, name)
 
     def on_release(self, event: tk.Event) -> None:  # type: ignore[override]
         mode = self.mode.get()
@@ -360,75 +506,69 @@ class MapEditor:
                 outline=layer.color,
                 fill=layer.color,
                 state=tk.NORMAL if layer.visible else tk.HIDDEN,
+                tags=(layer.tag, "obstacle"),
             )
             rect = (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
-            self.obstacles.append(rect)
-            self.obstacle_meta.append(
-                {
-                    "id": self.next_id,
-                    "layer": layer.name,
-                    "attributes": {},
-                    "style": {"fill": layer.color},
-                }
-            )
-            index = len(self.obstacles) - 1
-            self.layer_items.setdefault(layer.name, []).append(item)
-            self.item_map[item] = ("obstacle", index)
-            self.history.append(("obstacle", item, None))
+            self.obstacles_xy.append(rect)
+            self.obstacle_meta[self.next_id] = {
+                "id": self.next_id,
+                "layer": layer.name,
+                "attributes": {},
+                "style": {"fill": layer.color},
+            }
+            self._obstacle_by_id[self.next_id] = len(self.obstacles_xy) - 1
+            self.layer_items.setdefault(layer.name, set()).add(item)
+            self.item_map[item] = ("obstacle", self.next_id)
+            self._push_history("obstacle", item, None)
             self.next_id += 1
             self._rect_start = None
         elif mode == "select" and self.selected_item is not None:
-            coords = self.canvas.coords(self.selected_item)
+            self._flush_move()
+            self._items_dirty = True
+            coords = np.reshape(self.canvas.coords(self.selected_item), (-1, 2))
             kind, info = self.item_map.get(self.selected_item, (None, None))
-            if kind == "line":
-                x1, y1, x2, y2 = coords
-                x1w, y1w = self.to_world(x1, y1)
-                x2w, y2w = self.to_world(x2, y2)
-                x1s, y1s = self.snap(x1w, y1w)
-                x2s, y2s = self.snap(x2w, y2w)
-                sx1, sy1 = self.to_screen(x1s, y1s)
-                sx2, sy2 = self.to_screen(x2s, y2s)
-                self.canvas.coords(self.selected_item, sx1, sy1, sx2, sy2)
-                self.lines[info] = ((x1s, y1s), (x2s, y2s))
-            elif kind == "node":
-                x1, y1, x2, y2 = coords
-                r = (x2 - x1) / 2
-                cxw, cyw = self.to_world(x1 + r, y1 + r)
-                cxs, cys = self.snap(cxw, cyw)
-                sxc, syc = self.to_screen(cxs, cys)
-                self.canvas.coords(
-                    self.selected_item, sxc - r, syc - r, sxc + r, syc + r
-                )
-                self.nodes[info] = (int(cxs), int(cys))
-            elif kind == "obstacle":
-                x1, y1, x2, y2 = coords
-                x1w, y1w = self.to_world(x1, y1)
-                x2w, y2w = self.to_world(x2, y2)
-                x1s, y1s = self.snap(x1w, y1w)
-                x2s, y2s = self.snap(x2w, y2w)
-                sx1, sy1 = self.to_screen(x1s, y1s)
-                sx2, sy2 = self.to_screen(x2s, y2s)
-                self.canvas.coords(self.selected_item, sx1, sy1, sx2, sy2)
-                self.obstacles[info] = (
-                    min(x1s, x2s),
-                    min(y1s, y2s),
-                    max(x1s, x2s),
-                    max(y1s, y2s),
-                )
-            elif kind in {"start", "goal"}:
-                x1, y1, x2, y2 = coords
-                size = (x2 - x1) / 2
-                cxw, cyw = self.to_world(x1 + size, y1 + size)
-                cxs, cys = self.snap(cxw, cyw)
-                sxc, syc = self.to_screen(cxs, cys)
-                self.canvas.coords(
-                    self.selected_item, sxc - size, syc - size, sxc + size, syc + size
-                )
-                name = info
-                self.agents.setdefault(name, {})[kind] = (int(cxs), int(cys))
+            if kind in {"line", "obstacle"}:
+                corners = self._snap_coords(coords)
+                screen = self._to_screen_vec(corners)
+                self.canvas.coords(self.selected_item, *screen.ravel().tolist())
+                if kind == "line":
+                    self.lines_xy[self._line_by_id[info]] = corners.ravel()
+                else:
+                    self.obstacles_xy[self._obstacle_by_id[info]] = np.concatenate(
+                        (corners.min(axis=0), corners.max(axis=0))
+                    )
+            elif kind in {"node", "start", "goal"}:
+                half = (coords[1] - coords[0]) / 2
+                center = self._snap_coords(coords[:1] + half)[0]
+                screen = self._to_screen_vec(center)
+                box = np.concatenate((screen - half, screen + half))
+                self.canvas.coords(self.selected_item, *box.tolist())
+                if kind == "node":
+                    self.nodes_xy[self._node_by_id[info]] = center
+                else:
+                    name = info
+                    x, y = center.tolist()
+                    self.agents.setdefault(name, {})[kind] = (x, y)
             self.selected_item = None
             self._drag_start = None
 
+    def _snap_vec(self, xy: np.ndarray) -> np.ndarray:
+        """Vectorised :meth:`snap` for an array of world coordinates."""
+
+        g = self.grid_size
+        return (g * np.round(xy / g)).astype(np.int32)
+
+    def _to_screen_vec(self, xy: np.ndarray) -> np.ndarray:
+        """Vectorised :meth:`to_screen` for an array of world coordinates."""
+
+        return np.rint(xy * self.zoom).astype(int)
+
+    def _snap_coords(self, coords: np.ndarray) -> np.ndarray:
+        """Snap ``(N, 2)`` canvas coordinates to grid points in world units."""
+
+        offset = (self.canvas.canvasx(0), self.canvas.canvasy(0))
+        return self._snap_vec((coords + offset) / self.zoom)
+
     def place_shape(self, x: int, y: int) -> None:
         g = self.grid_size
         try:
@@ -452,19 +592,19 @@ class MapEditor:
                 sy2,
                 fill=layer.color,
                 state=tk.NORMAL if layer.visible else tk.HIDDEN,
+                tags=(layer.tag, "line"),
             )
-            self.lines.append(((x, y), (x2, y)))
-            self.line_meta.append(
-                {
-                    "id": self.next_id,
-                    "layer": layer.name,
-                    "attributes": {},
-                    "style": {"color": layer.color},
-                }
-            )
-            self.layer_items.setdefault(layer.name, []).append(item)
-            self.item_map[item] = ("line", len(self.lines) - 1)
-            self.history.append(("line", item, None))
+            self.lines_xy.append((x, y, x2, y))
+            self.line_meta[self.next_id] = {
+                "id": self.next_id,
+                "layer": layer.name,
+                "attributes": {},
+                "style": {"color": layer.color},
+            }
+            self._line_by_id[self.next_id] = len(self.lines_xy) - 1
+            self.layer_items.setdefault(layer.name, set()).add(item)
+            self.item_map[item] = ("line", self.next_id)
+            self._push_history("line", item, None)
             self.next_id += 1
         elif shape == "V-Line":
             y2 = y + h
@@ -478,19 +618,19 @@ class MapEditor:
                 sy2,
                 fill=layer.color,
                 state=tk.NORMAL if layer.visible else tk.HIDDEN,
+                tags=(layer.tag, "line"),
             )
-            self.lines.append(((x, y), (x, y2)))
-            self.line_meta.append(
-                {
-                    "id": self.next_id,
-                    "layer": layer.name,
-                    "attributes": {},
-                    "style": {"color": layer.color},
-                }
-            )
-            self.layer_items.setdefault(layer.name, []).append(item)
-            self.item_map[item] = ("line", len(self.lines) - 1)
-            self.history.append(("line", item, None))
+            self.lines_xy.append((x, y, x, y2))
+            self.line_meta[self.next_id] = {
+                "id": self.next_id,
+                "layer": layer.name,
+                "attributes": {},
+                "style": {"color": layer.color},
+            }
+            self._line_by_id[self.next_id] = len(self.lines_xy) - 1
+            self.layer_items.setdefault(layer.name, set()).add(item)
+            self.item_map[item] = ("line", self.next_id)
+            self._push_history("line", item, None)
             self.next_id += 1
         elif shape == "Cross":
             half_w = w // 2
@@ -508,19 +648,19 @@ class MapEditor:
                 sy2,
                 fill=layer.color,
                 state=tk.NORMAL if layer.visible else tk.HIDDEN,
+                tags=(layer.tag, "line"),
             )
-            self.lines.append(((hx1, hy1), (hx2, hy2)))
-            self.line_meta.append(
-                {
-                    "id": self.next_id,
-                    "layer": layer.name,
-                    "attributes": {},
-                    "style": {"color": layer.color},
-                }
-            )
-            self.layer_items.setdefault(layer.name, []).append(item)
-            self.item_map[item] = ("line", len(self.lines) - 1)
-            self.history.append(("line", item, None))
+            self.lines_xy.append((hx1, hy1, hx2, hy2))
+            self.line_meta[self.next_id] = {
+                "id": self.next_id,
+                "layer": layer.name,
+                "attributes": {},
+                "style": {"color": layer.color},
+            }
+            self._line_by_id[self.next_id] = len(self.lines_xy) - 1
+            self.layer_items.setdefault(layer.name, set()).add(item)
+            self.item_map[item] = ("line", self.next_id)
+            self._push_history("line", item, None)
             self.next_id += 1
             # Vertical
             vx1, vy1 = x, y - half_h
@@ -534,19 +674,19 @@ class MapEditor:
                 sy2,
                 fill=layer.color,
                 state=tk.NORMAL if layer.visible else tk.HIDDEN,
+                tags=(layer.tag, "line"),
             )
-            self.lines.append(((vx1, vy1), (vx2, vy2)))
-            self.line_meta.append(
-                {
-                    "id": self.next_id,
-                    "layer": layer.name,
-                    "attributes": {},
-                    "style": {"color": layer.color},
-                }
-            )
-            self.layer_items.setdefault(layer.name, []).append(item)
-            self.item_map[item] = ("line", len(self.lines) - 1)
-            self.history.append(("line", item, None))
+            self.lines_xy.append((vx1, vy1, vx2, vy2))
+            self.line_meta[self.next_id] = {
+                "id": self.next_id,
+                "layer": layer.name,
+                "attributes": {},
+                "style": {"color": layer.color},
+            }
+            self._line_by_id[self.next_id] = len(self.lines_xy) - 1
+            self.layer_items.setdefault(layer.name, set()).add(item)
+            self.item_map[item] = ("line", self.next_id)
+            self._push_history("line", item, None)
             self.next_id += 1
         elif shape == "Obstacle":
             x2 = x + w
@@ -562,19 +702,19 @@ class MapEditor:
                 outline=layer.color,
                 fill=layer.color,
                 state=tk.NORMAL if layer.visible else tk.HIDDEN,
+                tags=(layer.tag, "obstacle"),
             )
-            self.obstacles.append((x, y, x2, y2))
-            self.obstacle_meta.append(
-                {
-                    "id": self.next_id,
-                    "layer": layer.name,
-                    "attributes": {},
-                    "style": {"fill": layer.color},
-                }
-            )
-            self.layer_items.setdefault(layer.name, []).append(item)
-            self.item_map[item] = ("obstacle", len(self.obstacles) - 1)
-            self.history.append(("obstacle", item, None))
+            self.obstacles_xy.append((x, y, x2, y2))
+            self.obstacle_meta[self.next_id] = {
+                "id": self.next_id,
+                "layer": layer.name,
+                "attributes": {},
+                "style": {"fill": layer.color},
+            }
+            self._obstacle_by_id[self.next_id] = len(self.obstacles_xy) - 1
+            self.layer_items.setdefault(layer.name, set()).add(item)
+            self.item_map[item] = ("obstacle", self.next_id)
+            self._push_history("obstacle", item, None)
             self.next_id += 1
 
     def on_drag(self, event: tk.Event) -> None:  # type: ignore[override]
@@ -583,18 +723,61 @@ class MapEditor:
             and self.selected_item is not None
             and self._drag_start is not None
         ):
-            dx = event.x - self._drag_start[0]
-            dy = event.y - self._drag_start[1]
-            self.canvas.move(self.selected_item, dx, dy)
+            self._pending_move[0] += event.x - self._drag_start[0]
+            self._pending_move[1] += event.y - self._drag_start[1]
             self._drag_start = (event.x, event.y)
+            if self._move_after is None:
+                self._move_after = self.root.after_idle(self._flush_move)
+
+    def _flush_move(self) -> None:
+        """Apply the motion accumulated since the last idle cycle in one move."""
+
+        if self._move_after is not None:
+            self.root.after_cancel(self._move_after)
+            self._move_after = None
+        dx, dy = self._pending_move
+        self._pending_move = [0, 0]
+        if self.selected_item is not None and (dx or dy):
+            self.canvas.move(self.selected_item, dx, dy)
+
+    def on_pan(self, event: tk.Event) -> None:  # type: ignore[override]
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self.draw_grid()
 
     def on_zoom(self, event: tk.Event) -> None:  # type: ignore[override]
-        factor = 1.1 if event.delta > 0 else 0.9
+        # Wheel bursts are folded into one rescale per idle cycle.
+        self._zoom_pending *= 1.1 if event.delta > 0 else 0.9
+        if self._zoom_after is None:
+            self._zoom_after = self.root.after_idle(self._apply_zoom)
+
+    def _apply_zoom(self) -> None:
+        factor = self._zoom_pending
+        self._zoom_pending = 1.0
+        self._zoom_after = None
         self.zoom *= factor
         self.canvas.delete("grid")
+        self._grid_bounds = None
         self.canvas.scale("all", 0, 0, factor, factor)
+        self._scroll_scale *= factor
+        if self._grid_after is not None:
+            self.root.after_cancel(self._grid_after)
+        self._grid_after = self.root.after(30, self._redraw_after_zoom)
+
+    def _redraw_after_zoom(self) -> None:
+        self._grid_after = None
         self.draw_grid()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        # ``bbox("all")`` visits every item, so it is only recomputed after
+        # elements were added, moved or removed; a pure zoom scales the
+        # cached box instead.
+        if self._items_dirty or self._scroll_bbox is None:
+            self._scroll_bbox = self.canvas.bbox("all")
+            self._items_dirty = False
+        elif self._scroll_scale != 1.0:
+            self._scroll_bbox = tuple(
+                int(round(v * self._scroll_scale)) for v in self._scroll_bbox
+            )
+        self._scroll_scale = 1.0
+        self.canvas.configure(scrollregion=self._scroll_bbox)
 
     def snap(self, x: int, y: int) -> Tuple[int, int]:
         g = self.grid_size
@@ -603,67 +786,129 @@ class MapEditor:
     def draw_grid(self) -> None:
         if not self.show_grid.get():
             return
-        self.canvas.delete("grid")
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        left = self.canvas.canvasx(0)
+        top = self.canvas.canvasy(0)
+        # Work in screen pixels. Lines closer than ``_GRID_MIN_STEP`` are
+        # thinned to every n-th grid line so they stay on snap positions
+        # without flooding the canvas when zoomed out.
         g = self.grid_size
-        left = int(self.canvas.canvasx(0) / self.zoom)
-        right = int(self.canvas.canvasx(self.canvas.winfo_width()) / self.zoom) + g
-        top = int(self.canvas.canvasy(0) / self.zoom)
-        bottom = int(
-            self.canvas.canvasy(self.canvas.winfo_height()) / self.zoom
-        ) + g
-        for x in range(left - left % g, right, g):
-            sx1, sy1 = self.to_screen(x, top)
-            sx2, sy2 = self.to_screen(x, bottom)
-            self.canvas.create_line(sx1, sy1, sx2, sy2, fill="#eee", tags="grid")
-        for y in range(top - top % g, bottom, g):
-            sx1, sy1 = self.to_screen(left, y)
-            sx2, sy2 = self.to_screen(right, y)
-            self.canvas.create_line(sx1, sy1, sx2, sy2, fill="#eee", tags="grid")
+        g *= max(1, math.ceil(_GRID_MIN_STEP / (g * self.zoom)))
+        step = g * self.zoom
+        # The grid lives in canvas coordinates, so scrolling needs no update
+        # until the view leaves the area drawn last time; that area reaches
+        # ``_GRID_SLACK`` viewports past each edge.
+        bounds = self._grid_bounds
+        if (
+            bounds is not None
+            and bounds[4] == step
+            and bounds[0] <= left
+            and bounds[1] <= top
+            and left + width <= bounds[2]
+            and top + height <= bounds[3]
+        ):
+            return
+        self.canvas.delete("grid")
+        pad_x = _GRID_SLACK * width
+        pad_y = _GRID_SLACK * height
+        columns = np.arange(
+            math.floor((left - pad_x) / step) - 1,
+            math.ceil((left + width + pad_x) / step) + 2,
+        )
+        rows = np.arange(
+            math.floor((top - pad_y) / step) - 1,
+            math.ceil((top + height + pad_y) / step) + 2,
+        )
+        xs = np.rint(columns * step).astype(int)
+        ys = np.rint(rows * step).astype(int)
+        self._grid_bounds = (
+            int(xs[1]), int(ys[1]), int(xs[-2]), int(ys[-2]), step
+        )
+        # Each direction is drawn as one zig-zag polyline whose connecting
+        # segments run one cell outside the drawn area, so the whole grid
+        # costs two canvas items instead of one per grid line.
+        for fixed, ends, vertical in ((xs, ys, True), (ys, xs, False)):
+            near, far = ends[0], ends[-1]
+            end = np.where(np.arange(len(fixed)) % 2 == 0, near, far)
+            points = np.empty((len(fixed), 2, 2), dtype=int)
+            points[:, :, 0 if vertical else 1] = fixed[:, None]
+            points[:, 0, 1 if vertical else 0] = end
+            points[:, 1, 1 if vertical else 0] = near + far - end
+            self.canvas.create_line(
+                *points.ravel().tolist(), fill="#eee", tags="grid"
+            )
+        self.canvas.tag_lower("grid")
 
     def update_grid(self) -> None:
         try:
             self.grid_size = max(5, int(self.grid_var.get()))
         except tk.TclError:
             return
+        self._schedule_grid_redraw()
+
+    def _schedule_grid_redraw(self) -> None:
+        # Repeated grid edits and Show Grid toggles collapse into one redraw.
+        if self._grid_redraw_after is None:
+            self._grid_redraw_after = self.root.after_idle(self._redraw_grid)
+
+    def _redraw_grid(self) -> None:
+        self._grid_redraw_after = None
         self.canvas.delete("grid")
+        self._grid_bounds = None
         self.draw_grid()
 
     def clear(self) -> None:
-        self.canvas.delete("all")
+        if self._load_after is not None:
+            self.root.after_cancel(self._load_after)
+            self._load_after = None
+        self._load_iter = None
+        # Element items are hidden and pooled rather than deleted, so the next
+        # load can move and restyle them instead of creating new ones.
+        for kind, pool in self._item_pool.items():
+            pool.extend(self.canvas.find_withtag(kind))
+            self.canvas.addtag_withtag(_POOL_TAG, kind)
+        self.canvas.itemconfigure(_POOL_TAG, state=tk.HIDDEN, tags=_POOL_TAG)
+        self.canvas.delete(f"!{_POOL_TAG}")
+        self._grid_bounds = None
+        self._items_dirty = True
         self.draw_grid()
-        self.lines.clear()
+        self.lines_xy.clear()
         self.line_meta.clear()
-        self.nodes.clear()
+        self.nodes_xy.clear()
         self.node_meta.clear()
-        self.obstacles.clear()
+        self.obstacles_xy.clear()
         self.obstacle_meta.clear()
         self.agents.clear()
         self.history.clear()
         self.item_map.clear()
-        self.layer_items = {layer.name: [] for layer in self.layers}
+        self._line_by_id.clear()
+        self._node_by_id.clear()
+        self._obstacle_by_id.clear()
+        self.layer_items = {layer.name: set() for layer in self.layers}
         self.next_id = 1
         self._line_start = None
         self._rect_start = None
         self.selected_item = None
 
+    def _push_history(self, kind: str, item: int, info: Any) -> None:
+        self._items_dirty = True
+        if not self.history or len(self.history[-1].ops) >= _HISTORY_BUCKET:
+            self.history.append(_HistoryBucket())
+        self.history[-1].ops.append((kind, item, info))
+
     def undo(self) -> None:
         if not self.history:
             return
-        kind, item, info = self.history.pop()
+        bucket = self.history[-1]
+        kind, item, info = bucket.ops.pop()
+        if not bucket.ops:
+            self.history.pop()
         self.canvas.delete(item)
-        self.item_map.pop(item, None)
-        if kind == "line" and self.lines:
-            meta = self.line_meta.pop()
-            self.lines.pop()
-            self.layer_items.get(meta["layer"], []).remove(item)
-        elif kind == "node" and self.nodes:
-            meta = self.node_meta.pop()
-            self.nodes.pop()
-            self.layer_items.get(meta["layer"], []).remove(item)
-        elif kind == "obstacle" and self.obstacles:
-            meta = self.obstacle_meta.pop()
-            self.obstacles.pop()
-            self.layer_items.get(meta["layer"], []).remove(item)
+        self._items_dirty = True
+        _kind, element = self.item_map.pop(item, (None, None))
+        if kind in {"line", "node", "obstacle"} and element is not None:
+            self._remove_element(kind, element, item)
         elif kind in {"start", "goal"}:
             name = info  # type: ignore[assignment]
             agent = self.agents.get(name, {})
@@ -671,35 +916,26 @@ class MapEditor:
             if not agent:
                 self.agents.pop(name, None)
 
+    def _remove_element(self, kind: str, element: int, item: int) -> None:
+        if kind == "line":
+            self._line_by_id.pop(element)
+            meta = self.line_meta.pop(element)
+        elif kind == "node":
+            self._node_by_id.pop(element)
+            meta = self.node_meta.pop(element)
+        else:
+            self._obstacle_by_id.pop(element)
+            meta = self.obstacle_meta.pop(element)
+        self.layer_items.get(meta["layer"], set()).discard(item)
+
     def delete_selected(self) -> None:
         if self.selected_item is None:
             return
         kind, info = self.item_map.pop(self.selected_item, (None, None))
         self.canvas.delete(self.selected_item)
-        if kind == "line":
-            index = info
-            meta = self.line_meta.pop(index)
-            self.lines.pop(index)
-            self.layer_items.get(meta["layer"], []).remove(self.selected_item)
-            for item, (k, idx) in list(self.item_map.items()):
-                if k == "line" and idx > index:
-                    self.item_map[item] = (k, idx - 1)
-        elif kind == "node":
-            index = info
-            meta = self.node_meta.pop(index)
-            self.nodes.pop(index)
-            self.layer_items.get(meta["layer"], []).remove(self.selected_item)
-            for item, (k, idx) in list(self.item_map.items()):
-                if k == "node" and idx > index:
-                    self.item_map[item] = (k, idx - 1)
-        elif kind == "obstacle":
-            index = info
-            meta = self.obstacle_meta.pop(index)
-            self.obstacles.pop(index)
-            self.layer_items.get(meta["layer"], []).remove(self.selected_item)
-            for item, (k, idx) in list(self.item_map.items()):
-                if k == "obstacle" and idx > index:
-                    self.item_map[item] = (k, idx - 1)
+        self._items_dirty = True
+        if kind in {"line", "node", "obstacle"}:
+            self._remove_element(kind, info, self.selected_item)
         elif kind in {"start", "goal"}:
             name = info
             agent = self.agents.get(name, {})
@@ -713,14 +949,22 @@ class MapEditor:
             defaultextension=".json", filetypes=[("JSON", "*.json")]
         )
         if path:
+            lines = self.lines_xy[list(self._line_by_id.values())]
+            nodes = self.nodes_xy[list(self._node_by_id.values())]
+            obstacles = self.obstacles_xy[list(self._obstacle_by_id.values())]
+            # save_map streams each entry, so pass lazy views rather than
+            # building Python lists of the geometry.
             data = {
-                "layers": [layer.__dict__ for layer in self.layers],
-                "lines": self.lines,
-                "line_meta": self.line_meta,
-                "nodes": self.nodes,
-                "node_meta": self.node_meta,
-                "obstacles": self.obstacles,
-                "obstacle_meta": self.obstacle_meta,
+                "layers": [
+                    {"name": layer.name, "color": layer.color, "visible": layer.visible}
+                    for layer in self.layers
+                ],
+                "lines": map(np.ndarray.tolist, lines.reshape(-1, 2, 2)),
+                "line_meta": self.line_meta.values(),
+                "nodes": map(np.ndarray.tolist, nodes),
+                "node_meta": self.node_meta.values(),
+                "obstacles": map(np.ndarray.tolist, obstacles),
+                "obstacle_meta": self.obstacle_meta.values(),
                 "agents": self.agents,
             }
             save_map(data, path)
@@ -735,8 +979,11 @@ class MapEditor:
                 [{"name": "Default", "color": "#000000", "visible": True}],
             )
         ]
+        self._layer_by_name = {}
+        for layer in self.layers:
+            self._layer_by_name.setdefault(layer.name, layer)
         self.layer_var.set(self.layers[0].name)
-        self.layer_items = {layer.name: [] for layer in self.layers}
+        self.layer_items = {layer.name: set() for layer in self.layers}
         self.refresh_layer_menu()
         metas = (
             data.get("line_meta", [])
@@ -744,86 +991,154 @@ class MapEditor:
             + data.get("obstacle_meta", [])
         )
         if metas:
-            self.next_id = max(m.get("id", 0) for m in metas) + 1
-        for line, meta in zip(data.get("lines", []), data.get("line_meta", [])):
-            (x1, y1), (x2, y2) = line
-            layer = self.get_layer(meta.get("layer", "Default"))
-            sx1, sy1 = self.to_screen(x1, y1)
-            sx2, sy2 = self.to_screen(x2, y2)
-            item = self.canvas.create_line(
-                sx1,
-                sy1,
-                sx2,
-                sy2,
-                fill=layer.color,
-                state=tk.NORMAL if layer.visible else tk.HIDDEN,
-            )
-            self.lines.append(((x1, y1), (x2, y2)))
-            self.line_meta.append(meta)
-            self.layer_items.setdefault(layer.name, []).append(item)
-            self.item_map[item] = ("line", len(self.lines) - 1)
-            self.history.append(("line", item, None))
-        for (x, y), meta in zip(data.get("nodes", []), data.get("node_meta", [])):
-            r = 3
-            layer = self.get_layer(meta.get("layer", "Default"))
-            sx, sy = self.to_screen(x, y)
-            item = self.canvas.create_oval(
-                sx - r,
-                sy - r,
-                sx + r,
-                sy + r,
-                fill=layer.color,
-                state=tk.NORMAL if layer.visible else tk.HIDDEN,
-            )
-            self.nodes.append((x, y))
-            self.node_meta.append(meta)
-            self.layer_items.setdefault(layer.name, []).append(item)
-            self.item_map[item] = ("node", len(self.nodes) - 1)
-            self.history.append(("node", item, None))
-        for (x1, y1, x2, y2), meta in zip(
-            data.get("obstacles", []), data.get("obstacle_meta", [])
-        ):
-            layer = self.get_layer(meta.get("layer", "Default"))
-            sx1, sy1 = self.to_screen(x1, y1)
-            sx2, sy2 = self.to_screen(x2, y2)
-            item = self.canvas.create_rectangle(
-                sx1,
-                sy1,
-                sx2,
-                sy2,
-                outline=layer.color,
-                fill=layer.color,
-                state=tk.NORMAL if layer.visible else tk.HIDDEN,
-            )
-            self.obstacles.append((x1, y1, x2, y2))
-            self.obstacle_meta.append(meta)
-            self.layer_items.setdefault(layer.name, []).append(item)
-            self.item_map[item] = ("obstacle", len(self.obstacles) - 1)
-            self.history.append(("obstacle", item, None))
+            self.next_id = max(m.get("id") or 0 for m in metas) + 1
+        for key in ("line_meta", "node_meta", "obstacle_meta"):
+            seen: Set[int] = set()
+            for meta in data.get(key, []):
+                if meta.get("id") is None or meta["id"] in seen:
+                    meta["id"] = self.next_id
+                    self.next_id += 1
+                seen.add(meta["id"])
+        lines = np.asarray(data.get("lines", []), dtype=np.int32).reshape(-1, 4)
+        line_meta = data.get("line_meta", [])[: len(lines)]
+        lines = lines[: len(line_meta)]
+        first = len(self.lines_xy)
+        self.lines_xy.extend(lines)
+        for row, meta in enumerate(line_meta, first):
+            self.line_meta[meta["id"]] = meta
+            self._line_by_id[meta["id"]] = row
+        nodes = np.asarray(data.get("nodes", []), dtype=np.int32).reshape(-1, 2)
+        node_meta = data.get("node_meta", [])[: len(nodes)]
+        nodes = nodes[: len(node_meta)]
+        first = len(self.nodes_xy)
+        self.nodes_xy.extend(nodes)
+        for row, meta in enumerate(node_meta, first):
+            self.node_meta[meta["id"]] = meta
+            self._node_by_id[meta["id"]] = row
+        obstacles = np.asarray(data.get("obstacles", []), dtype=np.int32).reshape(-1, 4)
+        obstacle_meta = data.get("obstacle_meta", [])[: len(obstacles)]
+        obstacles = obstacles[: len(obstacle_meta)]
+        first = len(self.obstacles_xy)
+        self.obstacles_xy.extend(obstacles)
+        for row, meta in enumerate(obstacle_meta, first):
+            self.obstacle_meta[meta["id"]] = meta
+            self._obstacle_by_id[meta["id"]] = row
         for name, agent in data.get("agents", {}).items():
-            size = 4
-            self.agents[name] = {}
-            if "start" in agent:
-                sx, sy = agent["start"]
-                ssx, ssy = self.to_screen(sx, sy)
-                s_item = self.canvas.create_rectangle(
-                    ssx - size, ssy - size, ssx + size, ssy + size, fill="green"
-                )
-                self.agents[name]["start"] = (sx, sy)
-                self.item_map[s_item] = ("start", name)
-                self.history.append(("start", s_item, name))
-            if "goal" in agent:
-                gx, gy = agent["goal"]
-                sgx, sgy = self.to_screen(gx, gy)
-                g_item = self.canvas.create_rectangle(
-                    sgx - size, sgy - size, sgx + size, sgy + size, fill="red"
+            self.agents[name] = {
+                key: tuple(agent[key]) for key in ("start", "goal") if key in agent
+            }
+
+        # The model is complete at this point; canvas items are created in
+        # chunks from the event loop so a large map paints progressively
+        # instead of blocking the UI until every item exists.
+        self._load_iter = self._load_chunks(
+            lines, line_meta, nodes, node_meta, obstacles, obstacle_meta
+        )
+        self._pump_load()
+
+    def _load_chunks(
+        self,
+        lines: np.ndarray,
+        line_meta: List[Dict[str, Any]],
+        nodes: np.ndarray,
+        node_meta: List[Dict[str, Any]],
+        obstacles: np.ndarray,
+        obstacle_meta: List[Dict[str, Any]],
+    ) -> Iterator[bool]:
+        """Create the canvas items of a loaded map, yielding after each batch.
+
+        World coordinates are converted per batch, so batches created after
+        a zoom use the new scale like the items :meth:`_apply_zoom` rescaled.
+        """
+
+        r = 3
+        for item_type, kind, world, all_meta in (
+            ("line", "line", lines, line_meta),
+            ("oval", "node", nodes, node_meta),
+            ("rectangle", "obstacle", obstacles, obstacle_meta),
+        ):
+            for start in range(0, len(all_meta), _LOAD_CHUNK):
+                metas = all_meta[start : start + _LOAD_CHUNK]
+                screen = self._to_screen_vec(world[start : start + _LOAD_CHUNK])
+                if kind == "node":
+                    screen = np.concatenate((screen - r, screen + r), axis=1)
+                layers = [self.get_layer(m.get("layer", "Default")) for m in metas]
+                options = []
+                for layer in layers:
+                    opts: Tuple[Any, ...] = (
+                        "-fill",
+                        layer.color,
+                        "-state",
+                        tk.NORMAL if layer.visible else tk.HIDDEN,
+                        "-tags",
+                        (layer.tag, kind),
+                    )
+                    if kind == "obstacle":
+                        opts = ("-outline", layer.color) + opts
+                    options.append(opts)
+                pool = self._item_pool[kind]
+                reuse = pool[: len(metas)]
+                del pool[: len(metas)]
+                items = self._create_items(item_type, screen.tolist(), options, reuse)
+                for item, meta, layer in zip(items, metas, layers):
+                    self.layer_items.setdefault(layer.name, set()).add(item)
+                    self.item_map[item] = (kind, meta["id"])
+                yield True
+        # Reused items keep their old stacking position; restore the order a
+        # fresh load creates and drop the pooled items this map did not need.
+        for kind, pool in self._item_pool.items():
+            self.canvas.tag_raise(kind)
+            pool.clear()
+        self.canvas.delete(_POOL_TAG)
+        size = 4
+        for name, agent in list(self.agents.items()):
+            for mode, color in (("start", "green"), ("goal", "red")):
+                if mode not in agent:
+                    continue
+                sx, sy = self.to_screen(*agent[mode])
+                item = self.canvas.create_rectangle(
+                    sx - size, sy - size, sx + size, sy + size, fill=color
                 )
-                self.agents[name]["goal"] = (gx, gy)
-                self.item_map[g_item] = ("goal", name)
-                self.history.append(("goal", g_item, name))
+                self.item_map[item] = (mode, name)
+        yield True
+
+    def _create_items(
+        self,
+        item_type: str,
+        coords: List[List[int]],
+        options: List[Tuple[Any, ...]],
+        reuse: List[int],
+    ) -> List[int]:
+        """Create one canvas item per ``coords`` row in a single Tcl call.
+
+        Each ``create_*`` call is a separate round trip through the Tcl
+        interpreter; running the loop inside Tcl leaves one per batch. The
+        first ``len(reuse)`` rows reconfigure those pooled items instead.
+        """
+
+        ids = self.canvas.tk.call(
+            "apply",
+            _BATCH_ITEMS,
+            str(self.canvas),
+            item_type,
+            tuple(map(tuple, coords)),
+            tuple(options),
+            tuple(reuse),
+        )
+        return [int(item) for item in self.canvas.tk.splitlist(ids)]
+
+    def _pump_load(self) -> None:
+        self._load_after = None
+        if self._load_iter is None:
+            return
+        self._items_dirty = True
+        if next(self._load_iter, False):
+            self._load_after = self.root.after_idle(self._pump_load)
+        else:
+            self._load_iter = None
 
     def load_template(self, name: str | None = None) -> None:
-        templates_dir = Path(__file__).with_name("templates")
+        templates_dir = Path(__file__).with_name("template")
         if name is None:
             path = filedialog.askopenfilename(
                 initialdir=templates_dir, filetypes=[("JSON", "*.json")]
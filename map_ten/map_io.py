@@ -2,14 +2,66 @@ from __future__ import annotations
 
 from pathlib import Path
 import json
+import mmap
+import os
+import tempfile
+import numpy as np
 import yaml
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
+
+# JSON files larger than this are parsed with ``orjson`` when it is installed;
+# below it the standard library is as fast once import costs are counted.
+_ORJSON_MIN_SIZE = 128 * 1024
 
 Line = Tuple[Tuple[int, int], Tuple[int, int]]
 PathType = List[Tuple[int, int]]
 Rect = Tuple[int, int, int, int]
 
 
+def _as_line(points: Any) -> Line:
+    p1, p2 = points
+    return (p1[0], p1[1]), (p2[0], p2[1])
+
+
+def _parse_collection(
+    raw: List[Any], key: str, default: Any, to_geom: Callable[[Any], Any]
+) -> Tuple[List[Any], List[Dict[str, Any]]]:
+    """Split ``raw`` entries into geometry and metadata lists.
+
+    Entries are either dicts holding the geometry under ``key`` next to their
+    metadata, or bare geometry, which is numbered from 1 on the default layer.
+    """
+
+    if raw and isinstance(raw[0], dict):
+        geom = [to_geom(entry.get(key, default)) for entry in raw]
+        meta = [
+            {
+                "id": entry.get("id"),
+                "layer": entry.get("layer", "Default"),
+                "attributes": entry.get("attributes", {}),
+                "style": entry.get("style", {}),
+            }
+            for entry in raw
+        ]
+    else:
+        geom = [to_geom(item) for item in raw]
+        meta = [
+            {"id": idx, "layer": "Default", "attributes": {}, "style": {}}
+            for idx in range(1, len(raw) + 1)
+        ]
+    return geom, meta
+
+
 def load_map(path: str | Path) -> Dict[str, Any]:
     """Load map description from a JSON or YAML file.
 
@@ -22,9 +74,13 @@ def load_map(path: str | Path) -> Dict[str, Any]:
 
     file_path = Path(path)
     if file_path.suffix in {".yml", ".yaml"}:
-        data = yaml.safe_load(file_path.read_text())
+        data = yaml.load(file_path.read_bytes(), Loader=_YamlLoader)
     elif file_path.suffix == ".json":
-        data = json.loads(file_path.read_text())
+        raw = file_path.read_bytes()
+        if orjson is not None and len(raw) > _ORJSON_MIN_SIZE:
+            data = orjson.loads(raw)
+        else:
+            data = json.loads(raw)
     else:
         raise ValueError(f"Unsupported file type: {file_path.suffix}")
 
@@ -32,86 +88,13 @@ def load_map(path: str | Path) -> Dict[str, Any]:
         "layers", [{"name": "Default", "color": "#000000", "visible": True}]
     )
 
-    lines: List[Line] = []
-    line_meta: List[Dict[str, Any]] = []
-    raw_lines = data.get("lines", [])
-    if raw_lines and isinstance(raw_lines[0], dict):
-        for entry in raw_lines:
-            p1, p2 = entry.get("points", [[0, 0], [0, 0]])
-            lines.append((tuple(p1), tuple(p2)))
-            line_meta.append(
-                {
-                    "id": entry.get("id"),
-                    "layer": entry.get("layer", "Default"),
-                    "attributes": entry.get("attributes", {}),
-                    "style": entry.get("style", {}),
-                }
-            )
-    else:
-        for idx, line in enumerate(raw_lines):
-            lines.append(tuple(map(tuple, line)))
-            line_meta.append(
-                {
-                    "id": idx + 1,
-                    "layer": "Default",
-                    "attributes": {},
-                    "style": {},
-                }
-            )
-
-    nodes: List[Tuple[int, int]] = []
-    node_meta: List[Dict[str, Any]] = []
-    raw_nodes = data.get("nodes", [])
-    if raw_nodes and isinstance(raw_nodes[0], dict):
-        for entry in raw_nodes:
-            pt = entry.get("point", [0, 0])
-            nodes.append(tuple(pt))
-            node_meta.append(
-                {
-                    "id": entry.get("id"),
-                    "layer": entry.get("layer", "Default"),
-                    "attributes": entry.get("attributes", {}),
-                    "style": entry.get("style", {}),
-                }
-            )
-    else:
-        for idx, pt in enumerate(raw_nodes):
-            nodes.append(tuple(pt))
-            node_meta.append(
-                {
-                    "id": idx + 1,
-                    "layer": "Default",
-                    "attributes": {},
-                    "style": {},
-                }
-            )
-
-    obstacles: List[Rect] = []
-    obstacle_meta: List[Dict[str, Any]] = []
-    raw_obs = data.get("obstacles", [])
-    if raw_obs and isinstance(raw_obs[0], dict):
-        for entry in raw_obs:
-            rect = entry.get("rect", [0, 0, 0, 0])
-            obstacles.append(tuple(rect))
-            obstacle_meta.append(
-                {
-                    "id": entry.get("id"),
-                    "layer": entry.get("layer", "Default"),
-                    "attributes": entry.get("attributes", {}),
-                    "style": entry.get("style", {}),
-                }
-            )
-    else:
-        for idx, rect in enumerate(raw_obs):
-            obstacles.append(tuple(rect))
-            obstacle_meta.append(
-                {
-                    "id": idx + 1,
-                    "layer": "Default",
-                    "attributes": {},
-                    "style": {},
-                }
-            )
+    lines, line_meta = _parse_collection(
+        data.get("lines", []), "points", [[0, 0], [0, 0]], _as_line
+    )
+    nodes, node_meta = _parse_collection(data.get("nodes", []), "point", [0, 0], tuple)
+    obstacles, obstacle_meta = _parse_collection(
+        data.get("obstacles", []), "rect", [0, 0, 0, 0], tuple
+    )
 
     agents = {
         name: {k: tuple(v[k]) for k in ("start", "goal") if k in v}
@@ -130,6 +113,33 @@ def load_map(path: str | Path) -> Dict[str, Any]:
     }
 
 
+def load_plan_input(
+    path: str | Path,
+) -> Tuple[List[Line], Dict[str, Tuple[Tuple[int, int], Tuple[int, int]]]]:
+    """Return the line segments and ``(start, goal)`` agents of a map file.
+
+    JSON maps are decoded straight into typed structs when ``msgspec`` is
+    installed; other inputs go through :func:`load_map`. Agents missing a
+    start or goal are skipped.
+    """
+
+    file_path = Path(path)
+    if file_path.suffix == ".json":
+        try:
+            from .schema import decode_plan_input
+        except ImportError:
+            pass
+        else:
+            return decode_plan_input(file_path.read_bytes())
+    data = load_map(file_path)
+    agents = {
+        name: (spec["start"], spec["goal"])
+        for name, spec in data.get("agents", {}).items()
+        if "start" in spec and "goal" in spec
+    }
+    return data["lines"], agents
+
+
 def save_paths(paths: Dict[str, PathType], path: str | Path) -> None:
     """Save agent paths to a JSON file.
 
@@ -141,77 +151,247 @@ def save_paths(paths: Dict[str, PathType], path: str | Path) -> None:
         Destination file name.
     """
 
-    file_path = Path(path)
-    serialised = {k: [list(coord) for coord in v] for k, v in paths.items()}
-    file_path.write_text(json.dumps({"paths": serialised}, indent=2))
+    Path(path).write_bytes(_dumps_indented({"paths": paths}))
+
+
+def _dumps_indented(obj: Any) -> bytes:
+    """Encode ``obj`` as JSON indented by two spaces, with ``orjson`` if present.
+
+    Both encoders write tuples as arrays, so coordinates need no conversion.
+    """
+
+    if orjson is not None:
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(obj, indent=2).encode()
+
+
+def save_paths_stream(
+    paths: Iterable[Tuple[str, PathType]], path: str | Path
+) -> None:
+    """Write ``(agent, path)`` pairs to a JSON file as they are produced.
+
+    The file has the same ``{"paths": {...}}`` layout as :func:`save_paths`,
+    but each agent is encoded and written on its own so no full document is
+    held in memory. The pairs go to a temporary file next to ``path`` that
+    replaces it only once complete, so if ``paths`` raises, an existing
+    file is left untouched.
+    """
+
+    dumps = orjson.dumps if orjson is not None else lambda o: json.dumps(o).encode()
+    path = Path(path)
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False
+    ) as f:
+        try:
+            f.write(b'{"paths": {')
+            first = True
+            for name, coords in paths:
+                if not first:
+                    f.write(b", ")
+                first = False
+                f.write(dumps(name))
+                f.write(b": ")
+                f.write(dumps(coords))
+            f.write(b"}}")
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, path)
 
 
 def save_map(data: Dict[str, Any], path: str | Path) -> None:
-    """Save map description to a JSON file including metadata and layers."""
+    """Save map description to a JSON file including metadata and layers.
 
-    file_path = Path(path)
+    Geometry, metadata and ``layers`` may be any iterables. Entries are
+    encoded and written one at a time, so the whole document is never built
+    in memory; the output has the same two-space indented layout as encoding
+    the whole mapping at once.
+    """
 
     def _combine_collection(
-        geom: List[Any], meta: List[Dict[str, Any]], key: str
-    ) -> List[Dict[str, Any]]:
-        combined: List[Dict[str, Any]] = []
+        geom: Iterable[Any], meta: Iterable[Dict[str, Any]], key: str
+    ) -> Iterator[Tuple[None, Dict[str, Any]]]:
         for g, m in zip(geom, meta):
-            if key == "points":
-                entry = {key: [list(pt) for pt in g]}
-            else:
-                entry = {key: list(g)}
+            entry = {key: g}
             entry.update(m)
-            combined.append(entry)
-        return combined
+            yield None, entry
 
-    serialised = {
-        "layers": data.get("layers", []),
-        "lines": _combine_collection(
-            data.get("lines", []), data.get("line_meta", []), "points"
+    sections = [
+        ("layers", ((None, layer) for layer in data.get("layers", []))),
+        (
+            "lines",
+            _combine_collection(
+                data.get("lines", []), data.get("line_meta", []), "points"
+            ),
         ),
-        "nodes": _combine_collection(
-            data.get("nodes", []), data.get("node_meta", []), "point"
+        (
+            "nodes",
+            _combine_collection(
+                data.get("nodes", []), data.get("node_meta", []), "point"
+            ),
         ),
-        "obstacles": _combine_collection(
-            data.get("obstacles", []), data.get("obstacle_meta", []), "rect"
+        (
+            "obstacles",
+            _combine_collection(
+                data.get("obstacles", []), data.get("obstacle_meta", []), "rect"
+            ),
         ),
-        "agents": {
-            k: {key: list(coords) for key, coords in v.items()}
-            for k, v in data.get("agents", {}).items()
-        },
-    }
+        ("agents", iter(data.get("agents", {}).items())),
+    ]
+
+    with Path(path).open("wb") as f:
+        f.write(b"{")
+        for i, (name, items) in enumerate(sections):
+            opener, closer = (b"{", b"}") if name == "agents" else (b"[", b"]")
+            f.write(b",\n  " if i else b"\n  ")
+            f.write(f"{json.dumps(name)}: ".encode() + opener)
+            first = True
+            for key, value in items:
+                f.write(b"\n    " if first else b",\n    ")
+                first = False
+                if key is not None:
+                    f.write(f"{json.dumps(key)}: ".encode())
+                f.write(_dumps_indented(value).replace(b"\n", b"\n    "))
+            f.write(closer if first else b"\n  " + closer)
+        f.write(b"\n}")
+
+
+def _to_builtin(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serialisable")
+
 
-    file_path.write_text(json.dumps(serialised, indent=2))
+_DIRECT_MIN_BYTES = 16 << 20
+_DIRECT_CHUNK = 1 << 20
 
 
-def export_occupancy_grid(
-    map_data: Dict[str, Any], resolution: int
-) -> List[List[int]]:
-    """Return a grid of ``0`` (free) and ``1`` (occupied) cells."""
+def _write_bytes_direct(path: str | Path, buf: bytes) -> None:
+    """Write ``buf`` to ``path``, bypassing the page cache for large payloads.
+
+    Buffers above 16 MiB are written with ``O_DIRECT`` in 1 MiB blocks staged
+    through an anonymous (page-aligned) ``mmap``; the zero padding of the last
+    block is truncated away. Small buffers, platforms without ``O_DIRECT`` and
+    filesystems that reject it fall back to :meth:`Path.write_bytes`.
+    """
+
+    file_path = Path(path)
+    if len(buf) < _DIRECT_MIN_BYTES or not hasattr(os, "O_DIRECT"):
+        file_path.write_bytes(buf)
+        return
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_DIRECT
+    try:
+        fd = os.open(file_path, flags, 0o644)
+    except OSError:
+        file_path.write_bytes(buf)
+        return
+    try:
+        view = memoryview(buf)
+        with mmap.mmap(-1, _DIRECT_CHUNK) as block:
+            for offset in range(0, len(view), _DIRECT_CHUNK):
+                chunk = view[offset : offset + _DIRECT_CHUNK]
+                block[: len(chunk)] = chunk
+                if len(chunk) < _DIRECT_CHUNK:
+                    block[len(chunk) :] = bytes(_DIRECT_CHUNK - len(chunk))
+                written = 0
+                while written < _DIRECT_CHUNK:
+                    written += os.write(fd, memoryview(block)[written:])
+        os.ftruncate(fd, len(buf))
+    except OSError:
+        os.close(fd)
+        file_path.write_bytes(buf)
+        return
+    os.close(fd)
+
+
+def write_json(obj: Any, path: str | Path) -> None:
+    """Write ``obj`` as compact JSON bytes.
+
+    NumPy arrays are serialised directly from their buffers when ``orjson``
+    is installed; otherwise the stdlib encoder converts them to lists.
+    """
+
+    if orjson is not None:
+        payload = orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        payload = json.dumps(
+            obj, default=_to_builtin, separators=(",", ":")
+        ).encode()
+    _write_bytes_direct(path, payload)
 
-    max_x = max_y = 0
-    for (x1, y1), (x2, y2) in map_data.get("lines", []):
-        max_x = max(max_x, x1, x2)
-        max_y = max(max_y, y1, y2)
-    for x, y in map_data.get("nodes", []):
-        max_x = max(max_x, x)
-        max_y = max(max_y, y)
-    for x1, y1, x2, y2 in map_data.get("obstacles", []):
-        max_x = max(max_x, x1, x2)
-        max_y = max(max_y, y1, y2)
+
+def _cbor_default(encoder: Any, value: Any) -> None:
+    if isinstance(value, np.ndarray):
+        encoder.encode(
+            {
+                "dtype": value.dtype.str,
+                "shape": list(value.shape),
+                "data": np.ascontiguousarray(value).tobytes(),
+            }
+        )
+    else:
+        encoder.encode(_to_builtin(value))
+
+
+def _restore_arrays(value: Any) -> Any:
+    if isinstance(value, dict):
+        if value.keys() == {"dtype", "shape", "data"}:
+            return np.frombuffer(value["data"], dtype=value["dtype"]).reshape(
+                value["shape"]
+            )
+        return {k: _restore_arrays(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_restore_arrays(v) for v in value]
+    return value
+
+
+def write_cbor(obj: Any, path: str | Path) -> None:
+    """Write ``obj`` as CBOR using ``cbor2``.
+
+    NumPy arrays are stored as ``{"dtype", "shape", "data"}`` maps whose
+    ``data`` is the raw C-order buffer, so a ``uint8`` grid costs one byte per
+    cell. :func:`read_cbor` restores them as arrays.
+    """
+
+    import cbor2
+
+    _write_bytes_direct(path, cbor2.dumps(obj, default=_cbor_default))
+
+
+def read_cbor(path: str | Path) -> Any:
+    """Load a file written by :func:`write_cbor`, rebuilding NumPy arrays."""
+
+    import cbor2
+
+    return _restore_arrays(cbor2.loads(Path(path).read_bytes()))
+
+
+def export_occupancy_grid(map_data: Dict[str, Any], resolution: int) -> np.ndarray:
+    """Return an ``(H, W)`` ``uint8`` grid of ``0`` (free) and ``1`` (occupied)."""
+
+    lines = np.asarray(map_data.get("lines", []), dtype=np.float64).reshape(-1, 4)
+    nodes = np.asarray(map_data.get("nodes", []), dtype=np.float64).reshape(-1, 2)
+    obstacles = np.asarray(map_data.get("obstacles", []), dtype=np.float64)
+    obstacles = obstacles.reshape(-1, 4)
+    points = np.concatenate((lines.reshape(-1, 2), nodes, obstacles.reshape(-1, 2)))
+    max_x, max_y = np.max(points, axis=0, initial=0)
 
     width = int(max_x / resolution) + 1
     height = int(max_y / resolution) + 1
-    grid = [[0 for _ in range(width)] for _ in range(height)]
-
-    for x1, y1, x2, y2 in map_data.get("obstacles", []):
-        x_start = int(x1 / resolution)
-        y_start = int(y1 / resolution)
-        x_end = int(x2 / resolution)
-        y_end = int(y2 / resolution)
-        for gx in range(x_start, x_end + 1):
-            for gy in range(y_start, y_end + 1):
-                if 0 <= gy < height and 0 <= gx < width:
-                    grid[gy][gx] = 1
+    grid = np.zeros((height, width), dtype=np.uint8)
+
+    # Cells covered by each rectangle, clipped to the grid as half-open
+    # ``[lo, hi)`` ranges so every obstacle is a single slice assignment.
+    cells = np.trunc(obstacles / resolution).astype(np.int64)
+    lo = np.maximum(cells[:, :2], 0)
+    hi = np.minimum(cells[:, 2:] + 1, (width, height))
+    for (x_start, y_start), (x_end, y_end) in zip(lo.tolist(), hi.tolist()):
+        if x_end > x_start and y_end > y_start:
+            grid[y_start:y_end, x_start:x_end] = 1
 
     return grid
\ No newline at end of file
@@ -1,10 +1,27 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import networkx as nx
 
-from .ten_builder import build_ten, k_shortest_paths
+import numpy as np
+
+try:
+    from ortools.graph.python import min_cost_flow
+except ImportError:  # pragma: no cover - optional dependency
+    min_cost_flow = None
+
+from . import _mcf_numba
+from ._conflict_numba import HAVE_NUMBA, first_conflict
+from .graph_builder import CSRGraph, contract_degree2, expand_path, goal_distances
+from .ten_builder import (
+    Heuristic,
+    TimeExpandedCSR,
+    build_ten,
+    build_ten_csr,
+    csr_k_shortest_paths,
+    k_shortest_paths,
+)
 from .reservation_table import ReservationTable
 
 Coordinate = Tuple[int, int]
@@ -17,28 +34,73 @@ def _extract_paths(
     agents: Dict[str, AgentSpec],
     horizon: int,
 ) -> Dict[str, PathType]:
+    # Successors of each node with one entry per unit of flow, reversed so
+    # ``pop`` yields them in the network's adjacency order.
+    successors: Dict[Tuple[Coordinate, int], List[Tuple[Coordinate, int]]] = {}
+    for u, edges in flow.items():
+        out = [v for v, f in edges.items() for _ in range(f)]
+        if out:
+            out.reverse()
+            successors[u] = out
     paths: Dict[str, PathType] = {}
     for agent, (start, _goal) in agents.items():
         node = (start, 0)
         path: PathType = [start]
         for _ in range(horizon):
-            edges = flow.get(node, {})
-            next_node = None
-            for v, f in edges.items():
-                if f > 0:
-                    next_node = v
-                    edges[v] -= 1
-                    break
-            if next_node is None:
+            out = successors.get(node)
+            if not out:
                 break
-            path.append(next_node[0])
-            node = next_node
+            node = out.pop()
+            path.append(node[0])
         paths[agent] = path
     return paths
 
 
 def _detect_conflict(
     paths: Dict[str, PathType],
+) -> Optional[Tuple[str, str, Coordinate, int]]:
+    if not HAVE_NUMBA or not paths:
+        return _detect_conflict_py(paths)
+    flat = _conflict_keys(paths)
+    if flat is None:
+        return _detect_conflict_py(paths)
+    agents = list(paths)
+    lengths = np.fromiter((len(p) for p in paths.values()), np.int64, len(agents))
+    offsets = np.cumsum(lengths) - lengths
+    steps = np.minimum(np.arange(lengths.max()), lengths[:, None] - 1)
+    first, second, t = first_conflict(flat[offsets[:, None] + steps])
+    if t < 0:
+        return None
+    path = paths[agents[second]]
+    return agents[first], agents[second], path[min(t, len(path) - 1)], int(t)
+
+
+def _conflict_keys(paths: Dict[str, PathType]) -> Optional[np.ndarray]:
+    """Return one int64 key per path node, or ``None`` if nodes do not fit.
+
+    Integer node ids are used as they are and integer ``(x, y)`` pairs with
+    32-bit coordinates are packed; anything else (floats, keys beyond int64,
+    other node types) is left to :func:`_detect_conflict_py`.
+    """
+
+    try:
+        flat = np.asarray([n for p in paths.values() for n in p])
+    except ValueError:
+        return None
+    if flat.dtype.kind != "i":
+        return None
+    flat = flat.astype(np.int64, copy=False)
+    if flat.ndim == 1:
+        return flat
+    if flat.ndim != 2 or flat.shape[1] != 2 or flat.size == 0:
+        return None
+    if flat.min() < -(1 << 31) or flat.max() >= 1 << 31:
+        return None
+    return (flat[:, 0] << 32) | (flat[:, 1] & 0xFFFFFFFF)
+
+
+def _detect_conflict_py(
+    paths: Dict[str, PathType],
 ) -> Optional[Tuple[str, str, Coordinate, int]]:
     max_len = max(len(p) for p in paths.values())
     for t in range(max_len):
@@ -56,40 +118,252 @@ def solve_mcf(
     agents: Dict[str, AgentSpec],
     horizon: int,
 ) -> Dict[str, PathType]:
-    graph = ten.copy()
-    for n in graph.nodes:
-        graph.nodes[n]["demand"] = 0
-    for agent, (start, goal) in agents.items():
-        graph.nodes[(start, 0)]["demand"] -= 1
-        graph.nodes[(goal, horizon)]["demand"] += 1
-    _cost, flow = nx.network_simplex(graph)
+    """Route one unit of flow per agent through ``ten``.
+
+    Uses OR-tools' compiled min-cost flow solver when it is installed and
+    ``nx.network_simplex`` otherwise. For the latter, demands are set on the
+    agents' source and sink nodes only for the duration of the solve, so
+    ``ten`` is reused instead of copied.
+    """
+
+    if min_cost_flow is not None:
+        return _extract_paths(_ortools_flow(ten, agents, horizon), agents, horizon)
+    touched: List[Dict[str, Any]] = []
+    try:
+        for agent, (start, goal) in agents.items():
+            for node, delta in (((start, 0), -1), ((goal, horizon), 1)):
+                attrs = ten.nodes[node]
+                attrs["demand"] = attrs.get("demand", 0) + delta
+                touched.append(attrs)
+        _cost, flow = nx.network_simplex(ten)
+    finally:
+        for attrs in touched:
+            attrs.pop("demand", None)
     return _extract_paths(flow, agents, horizon)
 
 
+def solve_mcf_csr(
+    ten: TimeExpandedCSR,
+    agents: Dict[str, Tuple[int, int]],
+    blocked: np.ndarray,
+) -> Dict[str, List[int]]:
+    """Route one unit of flow per agent through a :class:`TimeExpandedCSR`.
+
+    The counterpart of :func:`solve_mcf` for integer node ids, solved with
+    the compiled successive-shortest-paths kernel. Network nodes set in
+    ``blocked`` carry no flow.
+    """
+
+    count = len(ten.nodes)
+    n = len(ten.indptr) - 1
+    source, sink = n, n + 1
+    ends = np.asarray(list(agents.values()), dtype=np.int64).reshape(-1, 2)
+    starts = np.searchsorted(ten.nodes, ends[:, 0])
+    goals = np.searchsorted(ten.nodes, ends[:, 1]) + ten.horizon * count
+    units = len(ends)
+
+    # Among equally cheap flows, prefer the one with fewest moves: scaling
+    # the weights past the largest possible move count keeps the optimum.
+    ten_tails = np.repeat(np.arange(n, dtype=np.int64), np.diff(ten.indptr))
+    scale = units * ten.horizon + 1
+    weights = ten.weights * scale + (ten.indices != ten_tails + count)
+
+    # Network edges plus one edge from a super source to each start and from
+    # each goal to a super sink, followed by their zero-capacity reverses.
+    tails = np.concatenate([ten_tails, np.full(units, source), goals])
+    heads = np.concatenate([ten.indices, starts, np.full(units, sink)])
+    costs = np.concatenate([weights, np.zeros(2 * units, dtype=np.int64)])
+    caps = np.concatenate([ten.capacities, np.ones(2 * units, dtype=np.int32)])
+    edges = len(tails)
+    all_tails = np.concatenate([tails, heads])
+    order = np.argsort(all_tails, kind="stable")
+    slot = np.empty(2 * edges, dtype=np.int64)
+    slot[order] = np.arange(2 * edges)
+    pair = np.concatenate([np.arange(edges, 2 * edges), np.arange(edges)])
+    indptr = np.zeros(n + 3, dtype=np.int32)
+    np.cumsum(np.bincount(all_tails, minlength=n + 2), out=indptr[1:])
+    heads = np.concatenate([heads, tails])[order].astype(np.int32)
+    capacity = np.concatenate([caps, np.zeros(edges, dtype=np.int32)])[order]
+    residual = capacity.copy()
+
+    sent = _mcf_numba.min_cost_flow(
+        indptr,
+        heads,
+        np.concatenate([costs, -costs])[order],
+        residual,
+        slot[pair[order]],
+        np.concatenate([blocked, np.zeros(2, dtype=np.bool_)]),
+        source,
+        sink,
+        units,
+    )
+    if sent < units:
+        raise nx.NetworkXUnfeasible("no flow satisfies all node demands")
+    paths, lengths = _mcf_numba.extract_paths(
+        indptr, heads, capacity - residual, starts.astype(np.int32), ten.horizon
+    )
+    node_ids = ten.nodes[paths % count].tolist()
+    return {
+        agent: node_ids[i][:length]
+        for i, (agent, length) in enumerate(zip(agents, lengths.tolist()))
+    }
+
+
+def _ortools_flow(
+    ten: nx.DiGraph,
+    agents: Dict[str, AgentSpec],
+    horizon: int,
+) -> Dict[Tuple[Coordinate, int], Dict[Tuple[Coordinate, int], int]]:
+    """Solve the flow with OR-tools and return it shaped like ``network_simplex``."""
+
+    index = {node: i for i, node in enumerate(ten)}
+    edges = list(ten.edges(data=True))
+    count = len(edges)
+    tails = np.fromiter((index[u] for u, _v, _d in edges), np.int32, count)
+    heads = np.fromiter((index[v] for _u, v, _d in edges), np.int32, count)
+    caps = np.fromiter((d["capacity"] for _u, _v, d in edges), np.int64, count)
+    costs = np.fromiter((d.get("weight", 0) for _u, _v, d in edges), np.int64, count)
+    supplies = np.zeros(len(index), dtype=np.int64)
+    for start, goal in agents.values():
+        supplies[index[(start, 0)]] += 1
+        supplies[index[(goal, horizon)]] -= 1
+
+    solver = min_cost_flow.SimpleMinCostFlow()
+    arcs = solver.add_arcs_with_capacity_and_unit_cost(tails, heads, caps, costs)
+    solver.set_nodes_supplies(np.arange(len(index), dtype=np.int32), supplies)
+    if solver.solve() != solver.OPTIMAL:
+        raise nx.NetworkXUnfeasible("no flow satisfies all demands")
+    flow: Dict[Tuple[Coordinate, int], Dict[Tuple[Coordinate, int], int]] = {
+        node: {} for node in ten
+    }
+    for (u, v, _d), f in zip(edges, solver.flows(arcs).tolist()):
+        flow[u][v] = f
+    return flow
+
+
 def cbm_solve(
-    graph: nx.Graph,
+    graph: nx.Graph | CSRGraph,
     agents: Dict[str, AgentSpec],
     k: int = 3,
+    heuristic: Optional[Heuristic] = None,
+    landmarks: Optional[np.ndarray] = None,
 ) -> Dict[str, PathType]:
-    """Conflict-based min-cost flow planning."""
+    """Conflict-based min-cost flow planning.
+
+    ``heuristic`` is an optional admissible distance estimate forwarded to
+    :func:`k_shortest_paths`. A :class:`CSRGraph` is planned on integer node
+    ids with the compiled k-shortest-paths kernel; the returned paths are
+    translated back to coordinates. Its searches use exact distances to each
+    distinct goal, computed once in a batch, unless a ``landmarks`` distance
+    table is given, which trades them for ALT bounds that need no per-goal
+    preprocessing.
+    """
+
+    return dict(cbm_solve_iter(graph, agents, k, heuristic, landmarks))
+
+
+def cbm_solve_iter(
+    graph: nx.Graph | CSRGraph,
+    agents: Dict[str, AgentSpec],
+    k: int = 3,
+    heuristic: Optional[Heuristic] = None,
+    landmarks: Optional[np.ndarray] = None,
+) -> Iterator[Tuple[str, PathType]]:
+    """Like :func:`cbm_solve` but yield ``(agent, path)`` pairs.
+
+    Planning still completes before the first pair is produced; on a
+    :class:`CSRGraph` each path is translated to coordinates only when it is
+    yielded.
+    """
+
+    if isinstance(graph, CSRGraph):
+        coords = [tuple(xy) for xy in graph.node_xy.tolist()]
+        index = {xy: i for i, xy in enumerate(coords)}
+        for start, goal in agents.values():
+            for node in (start, goal):
+                if node not in index:
+                    raise nx.NodeNotFound(f"Node {node} not in graph")
+        ids = {a: (index[s], index[g]) for a, (s, g) in agents.items()}
+        # Candidate paths are searched on the graph with corridors contracted
+        # and expanded back before the time-expanded network is built, so
+        # every move still takes one time step.
+        contracted = contract_degree2(graph, {n for pair in ids.values() for n in pair})
+        local = {orig: i for i, orig in enumerate(contracted.node_ids.tolist())}
+        bounds = None if landmarks is None else landmarks[:, contracted.node_ids]
+        to_goal: Dict[int, np.ndarray] = {}
+        if bounds is None:
+            goals = sorted({local[g] for _s, g in ids.values()})
+            to_goal = dict(zip(goals, goal_distances(contracted.graph, goals)))
+
+        def search(start: int, goal: int) -> List[List[int]]:
+            goal = local[goal]
+            return [
+                expand_path(contracted, path)
+                for path in csr_k_shortest_paths(
+                    contracted.graph, local[start], goal, k, bounds, to_goal.get(goal)
+                )
+            ]
+
+        paths = _cbm_search(graph, ids, search)
+        for agent, path in paths.items():
+            yield agent, [coords[n] for n in path]
+        return
+    yield from _cbm_search(
+        graph,
+        agents,
+        lambda s, g: k_shortest_paths(graph, s, g, k, heuristic),
+    ).items()
+
 
+def _cbm_search(
+    graph: nx.Graph | CSRGraph,
+    agents: Dict[str, AgentSpec],
+    search: Callable[[Coordinate, Coordinate], List[PathType]],
+) -> Dict[str, PathType]:
     constraints: Dict[str, set[Tuple[Coordinate, int]]] = {a: set() for a in agents}
-    reservation = ReservationTable()
-    while True:
-        paths_per_agent = {
-            a: k_shortest_paths(graph, start, goal, k)
-            for a, (start, goal) in agents.items()
-        }
+    if isinstance(graph, CSRGraph):
+        reservation = ReservationTable(len(graph.node_xy))
+    else:
+        reservation = ReservationTable()
+    # The graph and the agents are fixed, so the candidate paths and the
+    # network built from them are too; each round only removes (or, in the
+    # compiled CSR network, blocks) the node the latest conflict forbids.
+    # Agents sharing endpoints share a search.
+    ksp_cache: Dict[Tuple[Coordinate, Coordinate], List[PathType]] = {}
+    paths_per_agent = {}
+    for a, spec in agents.items():
+        if spec not in ksp_cache:
+            ksp_cache[spec] = search(*spec)
+        paths_per_agent[a] = ksp_cache[spec]
+    if isinstance(graph, CSRGraph) and HAVE_NUMBA:
+        csr_ten = build_ten_csr(graph, paths_per_agent)
+        blocked = np.zeros(len(csr_ten.indptr) - 1, dtype=np.bool_)
+
+        def solve() -> Dict[str, PathType]:
+            return solve_mcf_csr(csr_ten, agents, blocked)
+
+        def forbid(node: Coordinate, time: int) -> None:
+            index = csr_ten.node_index(node, time)
+            if index >= 0:
+                blocked[index] = True
+
+    else:
         ten, horizon = build_ten(graph, paths_per_agent)
-        for agent, forbidden in constraints.items():
-            for node, t in forbidden:
-                if (node, t) in ten:
-                    ten.remove_node((node, t))
-        paths = solve_mcf(ten, agents, horizon)
+
+        def solve() -> Dict[str, PathType]:
+            return solve_mcf(ten, agents, horizon)
+
+        def forbid(node: Coordinate, time: int) -> None:
+            if (node, time) in ten:
+                ten.remove_node((node, time))
+
+    while True:
+        paths = solve()
         conflict = _detect_conflict(paths)
         if conflict is None:
             for agent, path in paths.items():
                 reservation.reserve(agent, path)
             return paths
         a1, a2, node, time = conflict
-        constraints[a2].add((node, time))
\ No newline at end of file
+        constraints[a2].add((node, time))
+        forbid(node, time)
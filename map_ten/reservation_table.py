@@ -2,24 +2,47 @@ from __future__ import annotations
 
 from typing import Dict, List, Tuple
 
+import numpy as np
+
 Coordinate = Tuple[int, int]
 
 
 class ReservationTable:
-    """Tracks occupied nodes over time to avoid conflicts."""
+    """Tracks occupied nodes over time to avoid conflicts.
+
+    With ``num_nodes`` the nodes are integer ids in ``range(num_nodes)`` and
+    reservations live in a dense ``(T, num_nodes)`` array of agent numbers
+    that grows along ``T`` as longer paths are reserved; otherwise they are
+    kept in a dict keyed by ``(node, t)``.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, num_nodes: int | None = None, horizon: int = 0) -> None:
         self._table: Dict[Tuple[Coordinate, int], str] = {}
+        self._grid: np.ndarray | None = None
+        if num_nodes is not None:
+            self._grid = np.zeros((horizon, num_nodes), dtype=np.int32)
+        # Agents are stored in the dense table as ``1 + index``; 0 is free.
+        self._agent_ids: Dict[str, int] = {}
 
     def reserve(self, agent: str, path: List[Coordinate]) -> None:
-        for t, node in enumerate(path):
-            self._table[(node, t)] = agent
+        if self._grid is None:
+            for t, node in enumerate(path):
+                self._table[(node, t)] = agent
+            return
+        if len(path) > len(self._grid):
+            rows = max(len(path), 2 * len(self._grid))
+            grown = np.zeros((rows, self._grid.shape[1]), dtype=np.int32)
+            grown[: len(self._grid)] = self._grid
+            self._grid = grown
+        agent_id = self._agent_ids.setdefault(agent, len(self._agent_ids) + 1)
+        self._grid[np.arange(len(path)), np.asarray(path, dtype=np.int64)] = agent_id
 
     def is_reserved(self, node: Coordinate, time: int) -> bool:
-        return (node, time) in self._table
+        if self._grid is None:
+            return (node, time) in self._table
+        return time < len(self._grid) and bool(self._grid[time, node])
 
     def lock_ahead(self, agent: str, path: List[Coordinate], steps: int) -> None:
         """Reserve a prefix of ``path`` for ``steps`` time steps."""
 
-        for t, node in enumerate(path[:steps]):
-            self._table[(node, t)] = agent
\ No newline at end of file
+        self.reserve(agent, path[:steps])
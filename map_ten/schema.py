@@ -0,0 +1,48 @@
+"""Typed subset of the map file format, decoded with ``msgspec``.
+
+Only the fields the planner needs are declared; layers, nodes, obstacles
+and metadata are skipped by the decoder instead of being materialised.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple, Union
+
+import msgspec
+
+Point = Tuple[int, int]
+Line = Tuple[Point, Point]
+AgentSpec = Tuple[Point, Point]
+
+
+class LineEntry(msgspec.Struct):
+    points: Line = ((0, 0), (0, 0))
+
+
+class Agent(msgspec.Struct):
+    start: Optional[Point] = None
+    goal: Optional[Point] = None
+
+
+class MapData(msgspec.Struct):
+    lines: List[Union[Line, LineEntry]] = []
+    agents: Dict[str, Agent] = {}
+
+
+_decoder = msgspec.json.Decoder(MapData)
+
+
+def decode_plan_input(raw: bytes) -> Tuple[List[Line], Dict[str, AgentSpec]]:
+    """Decode JSON map bytes into line segments and complete agent specs."""
+
+    data = _decoder.decode(raw)
+    lines = [
+        entry.points if isinstance(entry, LineEntry) else entry
+        for entry in data.lines
+    ]
+    agents = {
+        name: (agent.start, agent.goal)
+        for name, agent in data.agents.items()
+        if agent.start is not None and agent.goal is not None
+    }
+    return lines, agents
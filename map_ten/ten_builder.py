@@ -1,12 +1,46 @@
 from __future__ import annotations
 
 import itertools
-from typing import Dict, List, Set, Tuple
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
 
 import networkx as nx
+import numpy as np
+
+from . import _ksp_numba
+from .graph_builder import (
+    CSRGraph,
+    csr_edge_weights,
+    csr_edges,
+    landmark_lower_bounds,
+)
 
 Line = Tuple[Tuple[int, int], Tuple[int, int]]
 PathType = List[Tuple[int, int]]
+Heuristic = Callable[[Tuple[int, int], Tuple[int, int]], float]
+
+
+class TimeExpandedCSR(NamedTuple):
+    """Time-expanded network stored as a CSR adjacency.
+
+    Network node ``t * len(nodes) + i`` is graph node ``nodes[i]`` at step
+    ``t``; ``nodes`` is sorted. Each row lists the wait edge first and then
+    the moves in graph order, all with capacity ``capacities[e]``.
+    """
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    weights: np.ndarray
+    capacities: np.ndarray
+    nodes: np.ndarray
+    horizon: int
+
+    def node_index(self, node: int, t: int) -> int:
+        """Return the network node of ``node`` at step ``t``, or ``-1``."""
+
+        i = int(np.searchsorted(self.nodes, node))
+        if t > self.horizon or i == len(self.nodes) or self.nodes[i] != node:
+            return -1
+        return t * len(self.nodes) + i
 
 
 def k_shortest_paths(
@@ -14,40 +48,149 @@ def k_shortest_paths(
     start: Tuple[int, int],
     goal: Tuple[int, int],
     k: int,
+    heuristic: Optional[Heuristic] = None,
 ) -> List[PathType]:
-    """Return up to ``k`` shortest simple paths between ``start`` and ``goal``."""
+    """Return up to ``k`` shortest simple paths between ``start`` and ``goal``.
+
+    When only one path is requested and an admissible ``heuristic`` is given,
+    the path is found with A* instead of Yen's algorithm.
+    """
 
+    if k == 1 and heuristic is not None:
+        return [nx.astar_path(graph, start, goal, heuristic=heuristic, weight="weight")]
     generator = nx.shortest_simple_paths(graph, start, goal, weight="weight")
     return list(itertools.islice(generator, k))
 
 
+def csr_k_shortest_paths(
+    graph: CSRGraph,
+    start: int,
+    goal: int,
+    k: int,
+    landmarks: Optional[np.ndarray] = None,
+    cost_to_go: Optional[np.ndarray] = None,
+) -> List[List[int]]:
+    """Return up to ``k`` shortest simple paths between node ids on a CSR graph.
+
+    Uses the compiled Yen kernel. ``cost_to_go`` holds the distance from every
+    node to ``goal`` (see :func:`goal_distances`) and is used directly as the
+    A* heuristic; otherwise ``landmarks`` distance tables give the ALT lower
+    bound.
+    """
+
+    if cost_to_go is not None:
+        h = np.ascontiguousarray(cost_to_go, dtype=np.int64)
+    elif landmarks is None:
+        h = np.zeros(len(graph.node_xy), dtype=np.int64)
+    else:
+        h = landmark_lower_bounds(landmarks, goal)
+    paths = _ksp_numba.yen(
+        graph.indptr, graph.indices, graph.weights, start, goal, k, h
+    )
+    if not paths:
+        # Report coordinates; the ids are internal (and possibly contracted).
+        start_xy, goal_xy = (tuple(graph.node_xy[n].tolist()) for n in (start, goal))
+        raise nx.NetworkXNoPath(f"No path between {start_xy} and {goal_xy}.")
+    return [path.tolist() for path in paths]
+
+
 def build_ten(
-    graph: nx.Graph, paths_per_agent: Dict[str, List[PathType]]
+    graph: nx.Graph | CSRGraph, paths_per_agent: Dict[str, List[PathType]]
 ) -> Tuple[nx.DiGraph, int]:
     """Build a time-expanded network from candidate paths.
 
-    Only edges that appear in at least one candidate path are expanded to keep
-    the network compact.
+    Only nodes and edges that appear in at least one candidate path are
+    expanded to keep the network compact. For a :class:`CSRGraph` the network
+    nodes are ``(node_id, t)`` pairs.
     """
 
+    if isinstance(graph, CSRGraph):
+        nodes = range(len(graph.node_xy))
+        edges = [
+            (u, v, {"weight": w})
+            for (u, v), w in zip(
+                csr_edges(graph).tolist(), csr_edge_weights(graph).tolist()
+            )
+        ]
+    else:
+        nodes = graph.nodes
+        edges = graph.edges(data=True)
+
     allowed_edges: Set[Line] = set()
+    active_nodes = set()
     max_len = 0
     for paths in paths_per_agent.values():
         for path in paths:
             max_len = max(max_len, len(path))
             allowed_edges.update(zip(path[:-1], path[1:]))
+            active_nodes.update(path)
     horizon = max_len
+    # Nodes on no candidate path would only carry isolated wait chains that
+    # no flow can enter; graph order is kept for the rest.
+    nodes = [node for node in nodes if node in active_nodes]
 
-    ten = nx.DiGraph()
+    # Edges are emitted in graph order, one time step after another.
+    wait = {"capacity": 1, "weight": 1}
+    moves = []
+    for u, v, data in edges:
+        if (u, v) in allowed_edges or (v, u) in allowed_edges:
+            moves.append((u, v, {"capacity": 1, "weight": data.get("weight", 1)}))
+    ten_edges = []
     for t in range(horizon):
-        for node in graph.nodes:
-            ten.add_node((node, t))
-            ten.add_edge((node, t), (node, t + 1), capacity=1, weight=1)
-        for u, v, data in graph.edges(data=True):
-            if (u, v) in allowed_edges or (v, u) in allowed_edges:
-                cost = data.get("weight", 1)
-                ten.add_edge((u, t), (v, t + 1), capacity=1, weight=cost)
-                ten.add_edge((v, t), (u, t + 1), capacity=1, weight=cost)
-    for node in graph.nodes:
-        ten.add_node((node, horizon))
-    return ten, horizon
\ No newline at end of file
+        ten_edges.extend(((node, t), (node, t + 1), wait) for node in nodes)
+        for u, v, attrs in moves:
+            ten_edges.append(((u, t), (v, t + 1), attrs))
+            ten_edges.append(((v, t), (u, t + 1), attrs))
+
+    ten = nx.DiGraph()
+    ten.add_edges_from(ten_edges)
+    ten.add_nodes_from((node, horizon) for node in nodes)
+    return ten, horizon
+
+
+def build_ten_csr(
+    graph: CSRGraph, paths_per_agent: Dict[str, List[List[int]]]
+) -> TimeExpandedCSR:
+    """Build the network of :func:`build_ten` for a :class:`CSRGraph` as arrays.
+
+    The result feeds the compiled min-cost flow kernel directly; no
+    per-node Python objects are created.
+    """
+
+    paths = [path for paths in paths_per_agent.values() for path in paths]
+    horizon = max((len(path) for path in paths), default=0)
+    nodes = np.unique(np.fromiter(itertools.chain.from_iterable(paths), np.int64))
+    n = len(graph.node_xy)
+    # Candidate path steps in both directions, packed as ``u * n + v``.
+    steps = [np.zeros(0, dtype=np.int64)]
+    for path in paths:
+        arr = np.asarray(path, dtype=np.int64)
+        steps.extend((arr[:-1] * n + arr[1:], arr[1:] * n + arr[:-1]))
+    allowed = np.unique(np.concatenate(steps))
+    rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(graph.indptr))
+    cols = graph.indices.astype(np.int64)
+    move = np.isin(rows * n + cols, allowed)
+
+    # One step of edges, sorted by tail with the wait edge ahead of the
+    # moves, is repeated for every step up to the horizon.
+    count = len(nodes)
+    local = np.arange(count, dtype=np.int64)
+    tails = np.concatenate([local, np.searchsorted(nodes, rows[move])])
+    heads = np.concatenate([local, np.searchsorted(nodes, cols[move])]) + count
+    weights = np.concatenate(
+        [np.ones(count, dtype=np.int64), graph.weights[move].astype(np.int64)]
+    )
+    order = np.argsort(tails, kind="stable")
+    offsets = np.arange(horizon, dtype=np.int64)[:, None] * count
+    degree = np.bincount(tails, minlength=count)
+    indptr = np.zeros(count * (horizon + 1) + 1, dtype=np.int32)
+    np.cumsum(np.tile(degree, horizon), out=indptr[1 : count * horizon + 1])
+    indptr[count * horizon + 1 :] = indptr[count * horizon]
+    return TimeExpandedCSR(
+        indptr,
+        (heads[order] + offsets).astype(np.int32).ravel(),
+        np.tile(weights[order], horizon),
+        np.ones(len(order) * horizon, dtype=np.int32),
+        nodes,
+        horizon,
+    )
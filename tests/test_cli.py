@@ -0,0 +1,64 @@
+import json
+import sys
+
+import numpy as np
+import pytest
+
+from map_ten import cli, mcf_solver, ten_builder
+from map_ten.graph_builder import landmark_distances, lines_to_csr
+
+LINES = [
+    [[0, 0], [1, 0]],
+    [[1, 0], [2, 0]],
+    [[1, 0], [1, 1]],
+    [[1, 1], [2, 1]],
+    [[2, 0], [2, 1]],
+]
+AGENTS = {
+    "a": {"start": [0, 0], "goal": [2, 1]},
+    "b": {"start": [1, 1], "goal": [2, 0]},
+}
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    counts = {"goal_distances": 0, "landmark_lower_bounds": 0}
+
+    def counting(module, name):
+        func = getattr(module, name)
+
+        def wrapper(*args, **kwargs):
+            counts[name] += 1
+            return func(*args, **kwargs)
+
+        monkeypatch.setattr(module, name, wrapper)
+
+    counting(mcf_solver, "goal_distances")
+    counting(ten_builder, "landmark_lower_bounds")
+    return counts
+
+
+def _plan(monkeypatch, tmp_path, *extra):
+    src = tmp_path / "map.json"
+    src.write_text(json.dumps({"lines": LINES, "agents": AGENTS}))
+    out = tmp_path / "paths.json"
+    argv = ["map-ten", "plan", str(src), str(out), "--cache-dir", str(tmp_path)]
+    monkeypatch.setattr(sys, "argv", argv + list(extra))
+    cli.main()
+    return json.loads(out.read_text())["paths"]
+
+
+def test_plan_uses_exact_goal_distances_by_default(monkeypatch, tmp_path, calls):
+    paths = _plan(monkeypatch, tmp_path)
+    assert calls == {"goal_distances": 1, "landmark_lower_bounds": 0}
+    assert sorted(paths) == ["a", "b"]
+
+
+def test_plan_with_alt_uses_landmark_bounds(monkeypatch, tmp_path, calls):
+    alt = tmp_path / "alt.npy"
+    lines = [tuple(map(tuple, line)) for line in LINES]
+    np.save(alt, landmark_distances(lines_to_csr(lines), 2))
+    paths = _plan(monkeypatch, tmp_path, "--alt", str(alt))
+    assert calls["goal_distances"] == 0
+    assert calls["landmark_lower_bounds"] == len(AGENTS)
+    assert sorted(paths) == ["a", "b"]
@@ -0,0 +1,14 @@
+import numpy as np
+
+from map_ten.graph_cache import lines_key, load_graph
+
+LINES = [((0, 0), (1, 0)), ((1, 0), (1, 1)), ((1, 1), (4, 1))]
+
+
+def test_load_graph_round_trips_through_cache(tmp_path):
+    graph, pivots = load_graph(LINES, tmp_path, landmarks=2)
+    assert [p.name for p in tmp_path.iterdir()] == [f"{lines_key(LINES, 2)}.npz"]
+    cached_graph, cached_pivots = load_graph(LINES, tmp_path, landmarks=2)
+    for a, b in zip(graph, cached_graph):
+        np.testing.assert_array_equal(a, b)
+    np.testing.assert_array_equal(pivots, cached_pivots)
@@ -0,0 +1,41 @@
+import json
+
+import networkx as nx
+import pytest
+
+from map_ten.map_io import save_paths_stream
+
+
+def test_save_paths_stream_writes_paths(tmp_path):
+    out = tmp_path / "paths.json"
+    save_paths_stream(iter([("a", [(0, 0), (1, 0)]), ("b", [(2, 2)])]), out)
+    assert json.loads(out.read_text()) == {
+        "paths": {"a": [[0, 0], [1, 0]], "b": [[2, 2]]}
+    }
+    assert [p.name for p in tmp_path.iterdir()] == ["paths.json"]
+
+
+def test_save_paths_stream_keeps_existing_file_on_failure(tmp_path):
+    out = tmp_path / "paths.json"
+    out.write_text('{"paths": {}}')
+
+    def failing_plan():
+        yield "a", [(0, 0)]
+        raise nx.NodeNotFound("Node (9, 9) not in graph")
+
+    with pytest.raises(nx.NodeNotFound):
+        save_paths_stream(failing_plan(), out)
+    assert out.read_text() == '{"paths": {}}'
+    assert [p.name for p in tmp_path.iterdir()] == ["paths.json"]
+
+
+def test_save_paths_stream_writes_nothing_on_failure(tmp_path):
+    out = tmp_path / "paths.json"
+
+    def failing_plan():
+        raise nx.NodeNotFound("Node (9, 9) not in graph")
+        yield
+
+    with pytest.raises(nx.NodeNotFound):
+        save_paths_stream(failing_plan(), out)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,172 @@
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from map_ten import mcf_solver
+from map_ten.graph_builder import (
+    contract_degree2,
+    goal_distances,
+    lines_to_csr,
+    lines_to_graph,
+    pack,
+)
+from map_ten.mcf_solver import (
+    _detect_conflict,
+    _detect_conflict_py,
+    cbm_solve,
+    cbm_solve_iter,
+    solve_mcf,
+    solve_mcf_csr,
+)
+from map_ten.ten_builder import build_ten, build_ten_csr, csr_k_shortest_paths
+
+
+@pytest.mark.parametrize(
+    "paths",
+    [
+        {"a": [(0, 0), (1, 0)], "b": [(1, 0), (1, 0)]},
+        {"a": [0, 1, 2], "b": [2, 1]},
+        {"a": [(0, -1), (1, -1)], "b": [(1, -1)]},
+        {"a": [pack(0, 0), pack(0, 3)], "b": [pack(1, 0), pack(0, 3)]},
+        {"a": [(0.2, 0), (1, 0)], "b": [(0.7, 0), (2, 0)]},
+        {"a": [(0.5, 0), (1, 0)], "b": [(0.5, 0), (2, 0)]},
+        {"a": [(1 << 40, 0)], "b": [(0, 0)]},
+        {"a": [(0, 0)], "b": [0]},
+        {"a": ["x", "y"], "b": ["z", "y"]},
+    ],
+)
+def test_detect_conflict_matches_python(paths):
+    assert _detect_conflict(paths) == _detect_conflict_py(paths)
+
+
+def test_detect_conflict_random_grid_paths():
+    rng = random.Random(0)
+    for _ in range(200):
+        paths = {
+            f"a{i}": [
+                (rng.randint(0, 3), rng.randint(0, 3))
+                for _ in range(rng.randint(1, 6))
+            ]
+            for i in range(rng.randint(1, 5))
+        }
+        assert _detect_conflict(paths) == _detect_conflict_py(paths)
+
+
+def test_cbm_solve_packed_graph():
+    lines = [((0, 0), (1, 0)), ((1, 0), (2, 0)), ((1, 0), (1, 1))]
+    graph = lines_to_graph(lines, packed=True)
+    agents = {"a": (pack(0, 0), pack(2, 0)), "b": (pack(1, 1), pack(0, 0))}
+    paths = cbm_solve(graph, agents, k=2)
+    assert {a: p[0] for a, p in paths.items()} == {a: s for a, (s, _) in agents.items()}
+    assert {p[-1] for p in paths.values()} == {g for _s, g in agents.values()}
+    assert _detect_conflict_py(paths) is None
+
+
+def test_no_path_reports_coordinates_on_csr_graph():
+    graph = lines_to_csr([((0, 0), (1, 0)), ((1, 0), (2, 0)), ((5, 5), (6, 5))])
+    with pytest.raises(nx.NetworkXNoPath, match=r"\(0, 0\) and \(6, 5\)"):
+        cbm_solve(graph, {"a": ((0, 0), (6, 5))})
+
+
+def _grid_csr(width):
+    lines = [((x, y), (x + 1, y)) for x in range(width - 1) for y in range(width)]
+    lines += [((x, y), (x, y + 1)) for x in range(width) for y in range(width - 1)]
+    return lines_to_csr(lines)
+
+
+def _flow_cost(graph, paths):
+    xy = graph.node_xy
+    return sum(
+        1 if u == v else int(abs(xy[u] - xy[v]).sum())
+        for path in paths.values()
+        for u, v in zip(path, path[1:])
+    )
+
+
+def test_solve_mcf_csr_matches_network_simplex():
+    rng = random.Random(0)
+    graph = _grid_csr(4)
+    nodes = range(len(graph.node_xy))
+    for _ in range(50):
+        count = rng.randint(1, 4)
+        ends = zip(rng.sample(nodes, count), rng.sample(nodes, count))
+        agents = {f"a{i}": spec for i, spec in enumerate(ends)}
+        paths_per_agent = {
+            a: csr_k_shortest_paths(graph, s, g, rng.randint(1, 3))
+            for a, (s, g) in agents.items()
+        }
+        ten, horizon = build_ten(graph, paths_per_agent)
+        csr_ten = build_ten_csr(graph, paths_per_agent)
+        assert csr_ten.horizon == horizon
+        assert len(csr_ten.indices) == ten.number_of_edges()
+        blocked = np.zeros(len(csr_ten.indptr) - 1, dtype=np.bool_)
+        # Only interior steps: without a source or sink node solve_mcf fails
+        # with KeyError rather than NetworkXUnfeasible.
+        for _ in range(rng.randint(0, 3) if horizon > 2 else 0):
+            node, t = rng.choice(nodes), rng.randint(1, horizon - 1)
+            if (node, t) in ten:
+                ten.remove_node((node, t))
+                blocked[csr_ten.node_index(node, t)] = True
+        try:
+            expected = _flow_cost(graph, solve_mcf(ten, agents, horizon))
+        except nx.NetworkXUnfeasible:
+            with pytest.raises(nx.NetworkXUnfeasible):
+                solve_mcf_csr(csr_ten, agents, blocked)
+            continue
+        paths = solve_mcf_csr(csr_ten, agents, blocked)
+        assert [p[0] for p in paths.values()] == [s for s, _ in agents.values()]
+        assert _flow_cost(graph, paths) == expected
+
+
+
+def _local_goals(graph, agents):
+    index = {xy: i for i, xy in enumerate(map(tuple, graph.node_xy.tolist()))}
+    ends = {index[xy] for spec in agents.values() for xy in spec}
+    local = {n: i for i, n in enumerate(contract_degree2(graph, ends).node_ids)}
+    return sorted({local[index[g]] for _s, g in agents.values()})
+
+
+@pytest.fixture
+def goal_batches(monkeypatch):
+    batches = []
+
+    def batched(g, goals):
+        batches.append(list(goals))
+        return goal_distances(g, goals)
+
+    monkeypatch.setattr(mcf_solver, "goal_distances", batched)
+    return batches
+
+
+def test_cbm_solve_iter_batches_deduplicated_goals(goal_batches):
+    graph = _grid_csr(4)
+    agents = {
+        "a": ((0, 0), (3, 3)),
+        "b": ((3, 0), (3, 3)),
+        "c": ((0, 3), (2, 1)),
+    }
+    # Agents sharing a goal always collide there, so planning fails; the
+    # distances are still computed once, before any search.
+    with pytest.raises(nx.NetworkXUnfeasible):
+        dict(cbm_solve_iter(graph, agents, k=2))
+    assert goal_batches == [_local_goals(graph, agents)]
+
+
+def test_cbm_solve_iter_shared_distances_keep_paths(monkeypatch, goal_batches):
+    graph = _grid_csr(4)
+    agents = {
+        "a": ((0, 0), (3, 3)),
+        "b": ((3, 0), (0, 3)),
+        "c": ((0, 3), (2, 1)),
+    }
+    shared = dict(cbm_solve_iter(graph, agents, k=2))
+    assert goal_batches == [_local_goals(graph, agents)]
+
+    def one_by_one(g, goals):
+        return np.concatenate([goal_distances(g, [goal]) for goal in goals])
+
+    monkeypatch.setattr(mcf_solver, "goal_distances", one_by_one)
+    assert dict(cbm_solve_iter(graph, agents, k=2)) == shared
+    assert [p[0] for p in shared.values()] == [s for s, _ in agents.values()]